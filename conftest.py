@@ -1,7 +1,11 @@
 # Django
 # First-Party
+import datetime
+
 import pytest
+from app.factories import SchoolFactory
 from app.factories import UserFactory
+from app.models import Vacancy
 from django.test.client import Client
 
 
@@ -48,3 +52,24 @@ def admin_client():
     client = Client()
     client.force_login(admin)
     return client
+
+
+@pytest.fixture
+def school():
+    school = SchoolFactory(
+        name='Renaissance High School',
+    )
+    return school
+
+
+@pytest.fixture
+def vacancy(school):
+    school.lat = 43.6121
+    school.lon = -116.3915
+    school.save()
+    vacancy = Vacancy.objects.create(
+        school=school,
+        date=datetime.date(2021, 3, 1),
+        band=Vacancy.BAND.high,
+    )
+    return vacancy
@@ -0,0 +1,76 @@
+# Standard Libary
+import bisect
+import re
+
+# Django
+from django.conf import settings
+
+_index = None
+
+
+def normalize(text):
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+class AddressIndex:
+    """
+    Sorted (key, address) pairs; a prefix is a contiguous run found
+    with two bisects.  Each address is also keyed without its house
+    number, so "main st" finds "123 Main St".
+    """
+
+    def __init__(self, addresses):
+        entries = set()
+        for address in addresses:
+            key = normalize(address)
+            if not key:
+                continue
+            entries.add((key, address))
+            number, _, street = key.partition(' ')
+            if number.isdigit() and street:
+                entries.add((street, address))
+        self.entries = sorted(entries)
+        self.keys = [key for key, address in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def search(self, prefix, limit=None):
+        limit = limit or settings.ADDRESS_AUTOCOMPLETE_LIMIT
+        prefix = normalize(prefix)
+        if len(prefix) < settings.ADDRESS_AUTOCOMPLETE_MIN_LENGTH:
+            return []
+        start = bisect.bisect_left(self.keys, prefix)
+        # Every key starting with prefix sorts below prefix + U+FFFF
+        end = bisect.bisect_left(self.keys, prefix + '\uffff', lo=start)
+        results = []
+        for key, address in self.entries[start:end]:
+            if address in results:
+                continue
+            results.append(address)
+            if len(results) == limit:
+                break
+        return results
+
+
+def load_addresses(path):
+    try:
+        with open(path) as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def get_address_index():
+    global _index
+    # Read once per process and kept in memory; public address points
+    # only, never volunteers' own addresses
+    if _index is None:
+        _index = AddressIndex(load_addresses(settings.ADDRESS_INDEX_PATH))
+    return _index
+
+
+def clear_address_index():
+    global _index
+    _index = None
+    return
@@ -2,15 +2,32 @@
 # First-Party
 from django.conf import settings
 from django.contrib import admin
+from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.admin import UserAdmin as UserAdminBase
+from django.utils.html import format_html_join
 from reversion.admin import VersionAdmin
 
 # Local
+from .dispatch import get_candidates
+from .exports import export_response
+from .exports import iter_account_rows
 from .forms import UserChangeForm
 from .forms import UserCreationForm
+from .matching import get_matches
+from .matching import rank_accounts
+from .matching import rank_schools
 from .models import Account
+from .models import Broadcast
+from .models import ExportCursor
+from .models import Offer
+from .models import Outbox
+from .models import School
 from .models import User
+from .models import Vacancy
+from .tasks import delay_unique
+from .tasks import dispatch_offers
+from .tasks import send_broadcast
 
 
 @admin.register(Account)
@@ -30,6 +47,7 @@ class AccountAdmin(VersionAdmin):
         'is_wasd',
         'wasd_notes',
         'schools',
+        'nearest_schools',
         'notes',
     ]
     list_display = [
@@ -52,7 +70,150 @@ class AccountAdmin(VersionAdmin):
         'created',
     ]
     readonly_fields = [
+        'nearest_schools',
     ]
+    actions = [
+        'export_csv',
+    ]
+
+    @admin.display(description='Nearest schools')
+    def nearest_schools(self, obj):
+        return format_html_join(
+            '\n',
+            '<div>{} ({} km)</div>',
+            (
+                (school.name, round(distance, 1))
+                for school, distance in get_matches(School, rank_schools(obj))
+            ),
+        ) or '-'
+
+    @admin.action(description='Export selected to CSV')
+    def export_csv(self, request, queryset):
+        return export_response(iter_account_rows(queryset))
+
+
+@admin.register(School)
+class SchoolAdmin(admin.ModelAdmin):
+    save_on_top = True
+    fields = [
+        'name',
+        'level',
+        'nces_id',
+        'low_grade',
+        'high_grade',
+        'grades',
+        'address',
+        'city',
+        'state',
+        'zipcode',
+        'county',
+        'phone',
+        'website',
+        'lat',
+        'lon',
+        'nearest_accounts',
+    ]
+    list_display = [
+        'name',
+        'level',
+        'phone',
+    ]
+    list_filter = [
+        'level',
+    ]
+    search_fields = [
+        'name',
+    ]
+    ordering = [
+        'name',
+    ]
+    readonly_fields = [
+        'nearest_accounts',
+    ]
+
+    @admin.display(description='Nearest volunteers')
+    def nearest_accounts(self, obj):
+        return format_html_join(
+            '\n',
+            '<div>{} ({} km)</div>',
+            (
+                (account.name, round(distance, 1))
+                for account, distance in get_matches(Account, rank_accounts(obj))
+            ),
+        ) or '-'
+
+
+@admin.register(Vacancy)
+class VacancyAdmin(admin.ModelAdmin):
+    save_on_top = True
+    fields = [
+        'school',
+        'date',
+        'band',
+        'is_certificate_required',
+        'notes',
+        'account',
+        'candidates',
+    ]
+    list_display = [
+        'school',
+        'date',
+        'band',
+        'state',
+        'account',
+    ]
+    list_filter = [
+        'state',
+        'band',
+        'date',
+    ]
+    search_fields = [
+        'school__name',
+    ]
+    autocomplete_fields = [
+        'school',
+        'account',
+    ]
+    ordering = [
+        '-date',
+    ]
+    readonly_fields = [
+        'candidates',
+    ]
+    actions = [
+        'send_offers',
+    ]
+
+    @admin.action(description='Send offers to top candidates')
+    def send_offers(self, request, queryset):
+        queryset = queryset.filter(state=Vacancy.STATE.open)
+        unlocated = queryset.filter(school__lat__isnull=True)
+        if unlocated.exists():
+            self.message_user(
+                request,
+                "Some schools have no location yet; run geocode_schools.",
+                messages.WARNING,
+            )
+        for vacancy in queryset.exclude(pk__in=unlocated):
+            delay_unique(dispatch_offers, str(vacancy.id))
+        return
+
+    @admin.display(description='Candidates')
+    def candidates(self, obj):
+        if not obj.pk:
+            return '-'
+        try:
+            candidates = get_candidates(obj)
+        except ValueError as error:
+            return str(error)
+        return format_html_join(
+            '\n',
+            '<div>{} ({} km)</div>',
+            (
+                (candidate['name'], round(candidate['distance'], 1))
+                for candidate in candidates
+            ),
+        ) or '-'
 
 
 @admin.register(User)
@@ -116,6 +277,109 @@ class UserAdmin(UserAdminBase):
         'name',
         'email',
     ]
+
+
+@admin.register(ExportCursor)
+class ExportCursorAdmin(admin.ModelAdmin):
+    list_display = [
+        'name',
+        'watermark',
+        'updated',
+    ]
+    search_fields = [
+        'name',
+    ]
+    ordering = [
+        'name',
+    ]
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    save_on_top = True
+    fields = [
+        'subject',
+        'template',
+        'html_template',
+        'attachment',
+        'state',
+        'checkpoint',
+        'sent_count',
+    ]
+    list_display = [
+        'subject',
+        'state',
+        'sent_count',
+        'updated',
+    ]
+    list_filter = [
+        'state',
+    ]
+    ordering = [
+        '-created',
+    ]
+    readonly_fields = [
+        'state',
+        'checkpoint',
+        'sent_count',
+    ]
+    actions = [
+        'send',
+    ]
+
+    @admin.action(description='Send (or resume) selected broadcasts')
+    def send(self, request, queryset):
+        for broadcast in queryset.exclude(state=Broadcast.STATE.sent):
+            delay_unique(send_broadcast, str(broadcast.id))
+        return
+
+
+@admin.register(Offer)
+class OfferAdmin(admin.ModelAdmin):
+    list_display = [
+        'vacancy',
+        'account',
+        'state',
+        'sent',
+    ]
+    list_filter = [
+        'state',
+    ]
+    search_fields = [
+        'account__name',
+        'vacancy__school__name',
+    ]
+    ordering = [
+        '-created',
+    ]
+    readonly_fields = [
+        'vacancy',
+        'account',
+        'state',
+        'token',
+        'sent',
+    ]
+
+
+@admin.register(Outbox)
+class OutboxAdmin(admin.ModelAdmin):
+    list_display = [
+        'operation',
+        'payload',
+        'created',
+    ]
+    list_filter = [
+        'operation',
+    ]
+    ordering = [
+        'created',
+    ]
+    readonly_fields = [
+        'operation',
+        'payload',
+        'created',
+    ]
+
 # Use Auth0 for login
 admin.site.login = staff_member_required(
     admin.site.login,
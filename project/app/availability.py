@@ -0,0 +1,214 @@
+# Standard Libary
+import datetime
+
+# Django
+from django.conf import settings
+from django.db.models import BinaryField
+from django.db.models import Case
+from django.db.models import F
+from django.db.models import Func
+from django.db.models import IntegerField
+from django.db.models import Q
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Cast
+from django.db.models.functions import Length
+
+# Bit n lives in byte n // 8 at bit n % 8, as Postgres get_bit/set_bit
+# number them; int.from_bytes(..., 'little') matches that layout.
+BYTE_ORDER = 'little'
+
+
+def get_school_year(date):
+    # The school year is named for the calendar year it starts in
+    if date.month >= settings.SCHOOL_YEAR_START_MONTH:
+        return date.year
+    return date.year - 1
+
+
+def get_year_start(year):
+    return datetime.date(year, settings.SCHOOL_YEAR_START_MONTH, 1)
+
+
+def get_day_index(date):
+    """
+    (year, bit) for a school day; one bit per weekday since the start of
+    the school year.  Weekends have no bit.
+    """
+    if date.weekday() >= 5:
+        return None
+    year = get_school_year(date)
+    start = get_year_start(year)
+    # Back up to the Monday on or before the start, then count weekdays
+    monday = start - datetime.timedelta(days=start.weekday())
+    weeks, weekday = divmod((date - monday).days, 7)
+    return year, weeks * 5 + weekday - min(start.weekday(), 5)
+
+
+def get_day_indexes(dates):
+    years = {}
+    for date in dates:
+        day = get_day_index(date)
+        if day is None:
+            continue
+        year, bit = day
+        years.setdefault(year, set()).add(bit)
+    return years
+
+
+def to_mask(bits):
+    mask = 0
+    for bit in bits:
+        mask |= 1 << bit
+    return mask
+
+
+def from_bitmap(bitmap):
+    return int.from_bytes(bytes(bitmap or b''), BYTE_ORDER)
+
+
+def to_bitmap(mask):
+    return mask.to_bytes(settings.AVAILABILITY_BYTES, BYTE_ORDER)
+
+
+def get_bit(bit):
+    return Func(
+        F('availability'),
+        Value(bit),
+        function='get_bit',
+        output_field=IntegerField(),
+    )
+
+
+def filter_available(queryset, dates):
+    """Accounts free on every one of the given school days."""
+    years = get_day_indexes(dates)
+    if not years:
+        return queryset
+    if len(years) > 1:
+        # A single bitmap only covers one school year
+        return queryset.none()
+    (year, bits), = years.items()
+    queryset = queryset.annotate(
+        availability_length=Length('availability'),
+    ).filter(
+        availability_year=year,
+        availability_length=settings.AVAILABILITY_BYTES,
+    )
+    # Checked in SQL; each day is one get_bit on the row's bytea
+    annotations = {f'available_{bit}': get_bit(bit) for bit in bits}
+    return queryset.annotate(**annotations).filter(
+        **{name: 1 for name in annotations}
+    )
+
+
+def filter_unknown(queryset, dates):
+    """
+    Accounts that haven't said whether they're free on the given days;
+    no bitmap, or one left over from another school year.
+    """
+    years = get_day_indexes(dates)
+    if not years:
+        # Weekends; filter_available already passes everyone
+        return queryset.none()
+    if len(years) > 1:
+        return queryset
+    (year, bits), = years.items()
+    return queryset.annotate(
+        availability_length=Length('availability'),
+    ).exclude(
+        availability_year=year,
+        availability_length=settings.AVAILABILITY_BYTES,
+    )
+
+
+def set_availability(queryset, dates, available=True):
+    """
+    Set or clear days for every account in the queryset with a single
+    UPDATE.  Bitmaps from another school year start over blank.
+    """
+    total = 0
+    for year, bits in get_day_indexes(dates).items():
+        bitmap = Case(
+            When(
+                Q(availability_year=year) & Q(availability__isnull=False),
+                then=F('availability'),
+            ),
+            default=Value(to_bitmap(0)),
+            output_field=BinaryField(),
+        )
+        for bit in sorted(bits):
+            bitmap = Func(
+                bitmap,
+                Value(bit),
+                Value(int(available)),
+                function='set_bit',
+                output_field=BinaryField(),
+            )
+        total += queryset.order_by().update(
+            availability=bitmap,
+            availability_year=year,
+        )
+    return total
+
+
+def get_remaining_days(today):
+    # School days from today to the end of today's school year
+    end = get_year_start(get_school_year(today) + 1)
+    days = (today + datetime.timedelta(days=n) for n in range((end - today).days))
+    return [day for day in days if day.weekday() < 5]
+
+
+def set_weekdays(queryset, weekdays, today):
+    """
+    Mark the given weekdays (Monday is 0) free for the rest of the
+    school year, and the other weekdays busy.
+    """
+    days = get_remaining_days(today)
+    set_availability(
+        queryset,
+        [day for day in days if day.weekday() in weekdays],
+    )
+    set_availability(
+        queryset,
+        [day for day in days if day.weekday() not in weekdays],
+        available=False,
+    )
+    return
+
+
+def get_weekdays(account, today):
+    """Weekdays free in the coming week, or None if never set."""
+    year = get_school_year(today)
+    if account.availability is None or account.availability_year != year:
+        return None
+    mask = from_bitmap(account.availability)
+    weekdays = []
+    for day in get_remaining_days(today)[:5]:
+        year, bit = get_day_index(day)
+        if mask >> bit & 1:
+            weekdays.append(day.weekday())
+    return sorted(weekdays)
+
+
+def get_masks(queryset, year):
+    """
+    In-memory path: (integer id, bitmap as int) for bitwise ranking.
+
+    Ids stay raw integers; encoding a hashid per row costs more than
+    the rest of the load.
+    """
+    rows = queryset.filter(
+        availability_year=year,
+    ).annotate(
+        number=Cast('id', output_field=IntegerField()),
+    ).values_list('number', 'availability')
+    return [(number, from_bitmap(bitmap)) for number, bitmap in rows]
+
+
+def free_on_all(masks, dates):
+    years = get_day_indexes(dates)
+    if len(years) != 1:
+        return []
+    mask = to_mask(*years.values())
+    return [pk for pk, value in masks if value & mask == mask]
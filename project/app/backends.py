@@ -1,8 +1,21 @@
 from django.contrib.auth.backends import ModelBackend
+from django.db.models.signals import post_save
 
 # Local
 from .models import User
 
+# Claims that change on every token and say nothing about the user
+TOKEN_CLAIMS = [
+    'iss',
+    'aud',
+    'iat',
+    'exp',
+    'auth_time',
+    'nonce',
+    'sid',
+    'at_hash',
+]
+
 
 class Auth0Backend(ModelBackend):
 
@@ -13,24 +26,26 @@ class Auth0Backend(ModelBackend):
         if name == email:
             name = 'Unknown'
         is_verified = kwargs.get('email_verified', False)
-        try:
-            user = User.objects.get(
-                username=username,
-            )
-            user.name = name
-            user.email = email
-            user.is_verified = is_verified
-            user.data = kwargs
-        except User.DoesNotExist:
-            user = User(
-                username=username,
-                name=name,
-                email=email,
-                is_verified=is_verified,
-                data=kwargs,
+        data = {
+            key: value for key, value in kwargs.items() if key not in TOKEN_CLAIMS
+        }
+        user, created, changed = User.objects.upsert(
+            username=username,
+            name=name,
+            email=email,
+            is_verified=is_verified,
+            data=data,
+        )
+        # The upsert bypasses save(), so signal receivers explicitly
+        if created or changed:
+            post_save.send(
+                sender=User,
+                instance=user,
+                created=created,
+                update_fields=None if created else frozenset(changed),
+                raw=False,
+                using=User.objects.db,
             )
-            user.set_unusable_password()
-        user.save()
         return user
 
     def get_user(self, user_id):
@@ -0,0 +1,194 @@
+# Standard Libary
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+# Django
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+# Every cached page carries this tag; bumping it drops them all (deploys)
+PAGES_TAG = 'pages'
+
+
+class LocalCache:
+    """Small per-process LRU with a short TTL, in front of Redis."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+local_cache = LocalCache(
+    maxsize=settings.PAGE_CACHE_LOCAL_SIZE,
+    ttl=settings.PAGE_CACHE_LOCAL_TTL,
+)
+
+
+def get_tag_key(tag):
+    return f'page:tag:{tag}'
+
+
+def get_tag_versions(tags):
+    keys = tuple(get_tag_key(tag) for tag in tags)
+    versions = local_cache.get(keys)
+    if versions is not None:
+        return versions
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # Seed from the clock so an evicted tag never reuses a version
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    versions = tuple(found[key] for key in keys)
+    local_cache.set(keys, versions)
+    return versions
+
+
+def invalidate_tags(*tags):
+    for tag in tags:
+        key = get_tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+    local_cache.clear()
+    return
+
+
+def get_page_key(request, tags):
+    versions = get_tag_versions(tags)
+    digest = hashlib.md5(
+        f'{request.path}|{versions}'.encode(),
+    ).hexdigest()
+    return f'page:{digest}'
+
+
+def is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # Each query string would be another entry; don't let them be minted
+    if request.GET:
+        return False
+    # Flash messages are rendered into the page
+    if len(get_messages(request)):
+        return False
+    return True
+
+
+def is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def anonymous_cache(tags=()):
+    """
+    Cache a view's full response for anonymous visitors.
+
+    Entries are keyed by path and the current version of each tag, so
+    invalidate_tags() retires them without having to find them.
+    """
+    tags = (PAGES_TAG, *tags)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view(request, *args, **kwargs)
+            key = get_page_key(request, tags)
+            page = local_cache.get(key)
+            if page is None:
+                page = cache.get(key)
+                if page is not None:
+                    local_cache.set(key, page)
+            if page is not None:
+                content, content_type = page
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+            if is_cacheable_response(request, response):
+                page = (response.content, response['Content-Type'])
+                cache.set(key, page, settings.PAGE_CACHE_TIMEOUT)
+                local_cache.set(key, page)
+            return response
+        return wrapper
+    return decorator
+
+
+def get_page_etag(request, tags, extra=''):
+    # Flash messages make the page one-off
+    if len(get_messages(request)):
+        return None
+    versions = get_tag_versions((PAGES_TAG, *tags))
+    user = request.user.pk if request.user.is_authenticated else ''
+    # Forms carry a token tied to the CSRF secret, which login rotates
+    secret = request.META.get('CSRF_COOKIE', '')
+    return hashlib.md5(
+        f'{versions}|{user}|{secret}|{extra}'.encode()
+    ).hexdigest()
+
+
+def page_etag(tags=(), etag_func=None, last_modified_func=None):
+    """
+    Emit an ETag built from the page's tag versions and answer matching
+    conditional GETs with a 304 before the view runs.
+    """
+    if etag_func is None:
+        def etag_func(request, *args, **kwargs):
+            return get_page_etag(request, tags)
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=etag_func,
+            last_modified_func=last_modified_func,
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            # Revalidate every time; private once the page is per-user
+            if request.user.is_authenticated:
+                patch_cache_control(response, no_cache=True, private=True)
+            else:
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,134 @@
+# Standard Libary
+import math
+
+# Django
+from django.conf import settings
+from django.db.models import Exists
+from django.db.models import F
+from django.db.models import OuterRef
+
+# Local
+from .availability import filter_available
+from .availability import filter_unknown
+from .matching import KM_PER_DEGREE
+from .matching import Points
+from .matching import get_bounds
+from .models import Account
+from .models import Vacancy
+
+# Preference tiers, best first
+PREFERS_SCHOOL = 0
+PREFERS_ANY = 1
+PREFERS_OTHER = 2
+
+CANDIDATE_FIELDS = [
+    'id',
+    'name',
+    'lat',
+    'lon',
+]
+
+
+def get_eligible_queryset(vacancy):
+    # Already booked elsewhere that day; one subquery so both conditions
+    # apply to the same vacancy
+    booked = Vacancy.objects.filter(
+        account=OuterRef('pk'),
+        date=vacancy.date,
+        state=Vacancy.STATE.filled,
+    )
+    queryset = Account.objects.filter(
+        is_eligible=True,
+        user__isnull=False,
+    ).exclude(
+        Exists(booked),
+    )
+    if vacancy.is_certificate_required:
+        queryset = queryset.filter(is_certificate=True)
+    return queryset
+
+
+def filter_tier(queryset, school, tier):
+    if tier == PREFERS_SCHOOL:
+        return queryset.filter(school_ids__contains=[school.id.id])
+    if tier == PREFERS_ANY:
+        return queryset.filter(school_ids=[])
+    return queryset.exclude(
+        school_ids__contains=[school.id.id],
+    ).exclude(
+        school_ids=[],
+    )
+
+
+def get_nearest(queryset, lat, lon, limit):
+    """
+    The limit nearest rows, found by growing a box around the point.
+
+    Each box is a range scan on the partial (lat, lon) index and is
+    ordered in SQL by equirectangular distance.  A box is enough once
+    its limit-th row lies inside the inscribed circle; nothing outside
+    can then be closer.
+    """
+    scale = math.cos(math.radians(lat))
+    queryset = queryset.annotate(
+        proximity=(
+            (F('lat') - lat) * (F('lat') - lat)
+            + (F('lon') - lon) * (F('lon') - lon) * scale * scale
+        ),
+    ).order_by('proximity')
+    radius = settings.DISPATCH_RADIUS_START_KM
+    while True:
+        lat_range, lon_range = get_bounds(lat, lon, radius)
+        # Rows rather than instances; model init dominates otherwise
+        rows = list(queryset.filter(
+            lat__range=lat_range,
+            lon__range=lon_range,
+        ).values_list(*CANDIDATE_FIELDS, 'proximity')[:limit])
+        if radius >= settings.DISPATCH_RADIUS_KM:
+            return rows
+        reach = radius / KM_PER_DEGREE
+        if len(rows) == limit and rows[-1][-1] <= reach * reach:
+            return rows
+        radius = min(radius * 2, settings.DISPATCH_RADIUS_KM)
+
+
+def get_candidates(vacancy, limit=None):
+    """
+    Ranked candidates: volunteers preferring the school, then those
+    willing to go anywhere, then the rest.  In each, those confirmed
+    free that day come before those who haven't said; nearest first.
+    Volunteers marked busy are left out.  Raises ValueError if the
+    school hasn't been located.
+    """
+    school = vacancy.school
+    if school.lat is None or school.lon is None:
+        # Nothing can be ranked; say so rather than offer no one
+        raise ValueError(f'{school} has no location; run geocode_schools')
+    limit = limit or settings.DISPATCH_LIMIT
+    queryset = get_eligible_queryset(vacancy)
+    dates = [vacancy.date]
+    rows = []
+    for tier in (PREFERS_SCHOOL, PREFERS_ANY, PREFERS_OTHER):
+        for is_confirmed, available in (
+            (True, filter_available),
+            (False, filter_unknown),
+        ):
+            remaining = limit - len(rows)
+            if not remaining:
+                break
+            nearest = get_nearest(
+                available(filter_tier(queryset, school, tier), dates),
+                school.lat,
+                school.lon,
+                remaining,
+            )
+            rows.extend((tier, is_confirmed, *row) for row in nearest)
+    points = Points((pk, lat, lon) for tier, is_confirmed, pk, name, lat, lon, proximity in rows)
+    distances = points.distances(school.lat, school.lon)
+    return [{
+        'id': pk,
+        'name': name,
+        'preference': tier,
+        'is_confirmed': is_confirmed,
+        'distance': distance,
+    } for (tier, is_confirmed, pk, name, lat, lon, proximity), distance in zip(rows, distances)]
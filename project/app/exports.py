@@ -0,0 +1,133 @@
+# Standard Libary
+import csv
+import datetime
+import zlib
+
+# Django
+from django.conf import settings
+from django.db.models import Min
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+# Local
+from .models import Account
+from .models import ExportCursor
+from .models import Tombstone
+
+ACCOUNT_COLUMNS = [
+    ('Status', 'state'),
+    ('Name', 'name'),
+    ('Address', 'address'),
+    ('Email', 'email'),
+    ('Phone', 'phone'),
+    ('SSN', 'ssn'),
+    ('Has Diploma', 'is_diploma'),
+    ('Has Certificate', 'is_certificate'),
+    ('Criminal Conviction', 'is_criminal'),
+    ('Notes on Conviction', 'criminal_notes'),
+    ('Sex Offender', 'is_offender'),
+    ('WASD Experience', 'is_wasd'),
+    ('WASD Notes', 'wasd_notes'),
+    ('School Preferences', 'schools'),
+    ('Notes', 'notes'),
+]
+
+
+class Echo:
+    """File-like object that hands back what csv.writer writes to it."""
+    def write(self, value):
+        return value
+
+
+def iter_account_rows(queryset):
+    states = dict(Account.STATE)
+    fields = [field for header, field in ACCOUNT_COLUMNS]
+    yield [header for header, field in ACCOUNT_COLUMNS]
+    # values_list skips model instances; iterator() uses a server-side
+    # cursor on Postgres so memory stays flat.
+    rows = queryset.order_by().values_list(*fields).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
+    for row in rows:
+        yield [states.get(row[0], row[0]), *row[1:]]
+
+
+def iter_account_delta_rows(cursor):
+    """
+    Rows changed since the cursor's watermark, then deletion tombstones.
+
+    The watermark only advances once the last row has been produced, so
+    an interrupted download is simply repeated next time.
+    """
+    states = dict(Account.STATE)
+    fields = [field for header, field in ACCOUNT_COLUMNS]
+    # Stay a little behind now so rows committed late aren't skipped
+    until = timezone.now() - datetime.timedelta(
+        seconds=settings.EXPORT_DELTA_LAG,
+    )
+    accounts = Account.objects.filter(updated__lte=until)
+    tombstones = Tombstone.objects.filter(deleted__lte=until)
+    if cursor.watermark:
+        accounts = accounts.filter(updated__gt=cursor.watermark)
+        tombstones = tombstones.filter(deleted__gt=cursor.watermark)
+    yield ['ID', 'Action', *[header for header, field in ACCOUNT_COLUMNS]]
+    rows = accounts.order_by('updated').values_list('id', *fields).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
+    for row in rows:
+        yield [row[0], 'upsert', states.get(row[1], row[1]), *row[2:]]
+    blanks = [''] * len(ACCOUNT_COLUMNS)
+    account_ids = tombstones.order_by('deleted').values_list(
+        'account_id',
+        flat=True,
+    ).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE,
+    )
+    for account_id in account_ids:
+        yield [account_id, 'delete', *blanks]
+    ExportCursor.objects.filter(pk=cursor.pk).update(
+        watermark=until,
+        updated=timezone.now(),
+    )
+    prune_tombstones()
+
+
+def prune_tombstones():
+    # Tombstones every cursor has already seen are no longer needed
+    oldest = ExportCursor.objects.aggregate(
+        oldest=Min('watermark'),
+    )['oldest']
+    if ExportCursor.objects.filter(watermark__isnull=True).exists():
+        return
+    if oldest:
+        Tombstone.objects.filter(deleted__lte=oldest).delete()
+    return
+
+
+def stream_csv(rows, compress=False):
+    writer = csv.writer(Echo())
+    if not compress:
+        for row in rows:
+            yield writer.writerow(row)
+        return
+    # wbits with 16 added writes a gzip header and trailer
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for row in rows:
+        chunk = compressor.compress(writer.writerow(row).encode())
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def export_response(rows, filename='hwa.csv', compress=False):
+    if compress:
+        content_type = 'application/gzip'
+        filename = f'{filename}.gz'
+    else:
+        content_type = 'text/csv'
+    response = StreamingHttpResponse(
+        stream_csv(rows, compress=compress),
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
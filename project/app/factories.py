@@ -4,9 +4,16 @@ from factory import PostGenerationMethodCall
 from factory.django import DjangoModelFactory
 
 # Local
+from .models import School
 from .models import User
 
 
+class SchoolFactory(DjangoModelFactory):
+    name = Faker('company')
+    class Meta:
+        model = School
+
+
 class UserFactory(DjangoModelFactory):
     name = Faker('name_male')
     email = Faker('email')
@@ -2,8 +2,11 @@
 from django import forms
 from django.contrib.auth.forms import UserChangeForm as UserChangeFormBase
 from django.contrib.auth.forms import UserCreationForm as UserCreationFormBase
+from django.utils import timezone
 
 # Local
+from .availability import get_weekdays
+from .availability import set_weekdays
 from .models import Account
 from .models import User
 from .widgets import AddressWidget
@@ -16,6 +19,39 @@ class DeleteForm(forms.Form):
 
 
 class AccountForm(forms.ModelForm):
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=[
+            (0, 'Monday'),
+            (1, 'Tuesday'),
+            (2, 'Wednesday'),
+            (3, 'Thursday'),
+            (4, 'Friday'),
+        ],
+        coerce=int,
+        required=False,
+        widget=forms.CheckboxSelectMultiple,
+        label="Which days are you usually available to substitute?",
+        help_text="Applies for the rest of the school year.",
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['weekdays'].initial = get_weekdays(
+            self.instance,
+            timezone.localdate(),
+        )
+
+    def save(self, commit=True):
+        account = super().save(commit=commit)
+        # Left alone until answered, so dispatch still treats it as unknown
+        if commit and 'weekdays' in self.changed_data:
+            set_weekdays(
+                Account.objects.filter(pk=account.pk),
+                self.cleaned_data['weekdays'],
+                timezone.localdate(),
+            )
+        return account
+
     class Meta:
         model = Account
         fields = [
@@ -0,0 +1,178 @@
+# Standard Libary
+import json
+import re
+
+# Django
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Local
+from .models import Geocode
+from .transport import get_session
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Components kept from the widget's legacy JSON
+ADDRESS_COMPONENTS = [
+    'street_number',
+    'route',
+    'locality',
+    'postal_code',
+    'state',
+    'state_code',
+    'country',
+    'country_code',
+]
+
+
+def encode_geohash(lat, lon, precision=None):
+    precision = precision or settings.GEOHASH_PRECISION
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    bits = 0
+    bit_count = 0
+    even = True
+    chars = []
+    while len(chars) < precision:
+        # Bits alternate longitude, latitude
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            bounds[0] = middle
+        else:
+            bits = bits * 2
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def normalize_address(text):
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def parse_address(value):
+    """
+    Split a stored address into (formatted, components, lat, lon).
+
+    Older rows hold the widget's JSON, sometimes single-quoted; anything
+    else is free text.
+    """
+    if not value:
+        return '', {}, None, None
+    try:
+        data = json.loads(re.sub(r"(?<!\\)'", '"', value))
+    except ValueError:
+        return value, {}, None, None
+    if not isinstance(data, dict):
+        return value, {}, None, None
+    components = {
+        key: data[key] for key in ADDRESS_COMPONENTS if data.get(key)
+    }
+    try:
+        lat = float(data.get('latitude', data.get('lat')))
+        lon = float(data.get('longitude', data.get('lng')))
+    except (TypeError, ValueError):
+        lat, lon = None, None
+    return data.get('formatted', ''), components, lat, lon
+
+
+class GeocodeError(Exception):
+    """The geocoder couldn't answer (quota, key, outage); try again later."""
+
+
+def get_empty_result(address):
+    return {
+        'formatted': address,
+        'components': {},
+        'lat': None,
+        'lon': None,
+    }
+
+
+class LocalGeocoder:
+    """Stand-in that resolves nothing; for development and tests."""
+
+    def geocode(self, address):
+        return get_empty_result(address)
+
+
+class GoogleGeocoder:
+    def geocode(self, address):
+        response = get_session().get(
+            'https://maps.googleapis.com/maps/api/geocode/json',
+            params={
+                'address': address,
+                'key': settings.GOOGLE_API_KEY,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        status = data.get('status')
+        # Only a definite miss may be cached; quota and key errors also
+        # come back as a 200 with no results
+        if status == 'ZERO_RESULTS':
+            return get_empty_result(address)
+        if status != 'OK':
+            raise GeocodeError(f"{status}: {data.get('error_message', '')}")
+        result = data['results'][0]
+        location = result['geometry']['location']
+        components = {}
+        for component in result['address_components']:
+            for kind in component['types']:
+                components[kind] = component['long_name']
+        return {
+            'formatted': result['formatted_address'],
+            'components': components,
+            'lat': location['lat'],
+            'lon': location['lng'],
+        }
+
+
+def get_geocoder():
+    return import_string(settings.GEOCODER)()
+
+
+def get_cached_geocode(address):
+    return Geocode.objects.filter(
+        normalized=normalize_address(address),
+    ).first()
+
+
+def geocode(address):
+    # Misses are cached too, so an address is only ever resolved once;
+    # GeocodeError leaves nothing cached
+    cached = get_cached_geocode(address)
+    if cached:
+        return cached
+    result = get_geocoder().geocode(address)
+    cached, created = Geocode.objects.get_or_create(
+        normalized=normalize_address(address),
+        defaults=result,
+    )
+    return cached
+
+
+def set_location(account, components, lat, lon):
+    account.address_components = components
+    account.lat = lat
+    account.lon = lon
+    account.geohash = encode_geohash(lat, lon) if lat is not None else ''
+    return
+
+
+def apply_address(account):
+    # Parsed once here so reads never touch the raw value again
+    formatted, components, lat, lon = parse_address(account.address)
+    account.address = formatted
+    if lat is None and formatted:
+        cached = get_cached_geocode(formatted)
+        if cached and cached.lat is not None:
+            components, lat, lon = cached.components, cached.lat, cached.lon
+    set_location(account, components, lat, lon)
+    return
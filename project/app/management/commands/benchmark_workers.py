@@ -0,0 +1,37 @@
+import time
+
+from app.workers import PersistentWorker
+from app.workers import ping
+from django.core.management.base import BaseCommand
+from django_rq import get_queue
+from rq import Queue
+from rq import Worker
+
+
+class Command(BaseCommand):
+    help = "Compare jobs/second for the forking and persistent workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=500,
+        )
+
+    def handle(self, *args, **options):
+        connection = get_queue().connection
+        queue = Queue('benchmark', connection=connection)
+        for worker_class in (Worker, PersistentWorker):
+            queue.empty()
+            queue.enqueue_many([
+                Queue.prepare_data(ping, result_ttl=0)
+                for _ in range(options['jobs'])
+            ])
+            worker = worker_class([queue], connection=connection)
+            start = time.perf_counter()
+            worker.work(burst=True, logging_level='WARNING')
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"{worker_class.__name__}: {options['jobs'] / elapsed:.1f} jobs/s"
+            )
+        queue.delete(delete_jobs=True)
@@ -0,0 +1,53 @@
+import csv
+import io
+
+from app.transport import get_session
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+
+def read_source(source):
+    if source.startswith(('http://', 'https://')):
+        response = get_session().get(source)
+        response.raise_for_status()
+        return io.StringIO(response.content.decode('utf-8-sig'))
+    return open(source, newline='', encoding='utf-8-sig')
+
+
+class Command(BaseCommand):
+    help = "Build the address autocomplete file from a county address-point CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=settings.ADDRESS_SOURCE_URL,
+            help="CSV path or URL, one row per address point.",
+        )
+        parser.add_argument(
+            '--format',
+            default=settings.ADDRESS_SOURCE_FORMAT,
+            help="Python format string over each row's columns.",
+        )
+        parser.add_argument(
+            '--output',
+            default=settings.ADDRESS_INDEX_PATH,
+        )
+
+    def handle(self, *args, **options):
+        if not options['source']:
+            raise CommandError("No source; pass --source or set ADDRESS_SOURCE_URL.")
+        addresses = set()
+        with read_source(options['source']) as f:
+            for row in csv.DictReader(f):
+                try:
+                    address = options['format'].format(**row)
+                except KeyError as error:
+                    raise CommandError(f"Source has no column {error}")
+                address = ' '.join(address.split())
+                if address:
+                    addresses.add(address)
+        with open(options['output'], 'w') as f:
+            for address in sorted(addresses):
+                f.write(f"{address}\n")
+        self.stdout.write(f"Wrote {len(addresses)} addresses.")
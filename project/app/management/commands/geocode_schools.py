@@ -0,0 +1,38 @@
+from app.geocoding import GeocodeError
+from app.geocoding import geocode
+from app.models import School
+from django.core.management.base import BaseCommand
+
+
+def get_school_query(school):
+    # The fixture has few street addresses; names resolve well enough
+    parts = [school.address or school.name, school.city, school.state or 'ID']
+    return ', '.join(part for part in parts if part)
+
+
+class Command(BaseCommand):
+    help = "Locate schools without coordinates, for dispatch and matching."
+
+    def handle(self, *args, **options):
+        schools = School.objects.filter(lat__isnull=True)
+        located = []
+        missed = []
+        for school in schools:
+            try:
+                cached = geocode(get_school_query(school))
+            except GeocodeError as error:
+                # Not cached; the next run asks again
+                missed.append(f'{school.name} ({error})')
+                continue
+            if cached.lat is None:
+                missed.append(school.name)
+                continue
+            school.lat = cached.lat
+            school.lon = cached.lon
+            located.append(school)
+        School.objects.bulk_update(located, ['lat', 'lon'])
+        for name in missed:
+            self.stderr.write(f"Could not locate {name}.")
+        self.stdout.write(
+            f"Located {len(located)} schools; {len(missed)} still unlocated."
+        )
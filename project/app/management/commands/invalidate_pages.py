@@ -0,0 +1,18 @@
+from app.caching import PAGES_TAG
+from app.caching import invalidate_tags
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Invalidate cached pages by tag (all pages by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'tags',
+            nargs='*',
+            default=[PAGES_TAG],
+        )
+
+    def handle(self, *args, **options):
+        invalidate_tags(*options['tags'])
+        self.stdout.write(f"Invalidated {', '.join(options['tags'])}.")
@@ -0,0 +1,76 @@
+import json
+
+from app.models import School
+from app.schools import clear_school_index
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+# Fixture columns copied onto School; pks are salted hashids, so rows
+# are matched on name instead
+SCHOOL_FIELDS = [
+    'level',
+    'nces_id',
+    'low_grade',
+    'high_grade',
+    'grades',
+    'address',
+    'city',
+    'state',
+    'zipcode',
+    'county',
+    'phone',
+    'website',
+    'lat',
+    'lon',
+]
+
+LOCATION_FIELDS = [
+    'lat',
+    'lon',
+]
+
+
+class Command(BaseCommand):
+    help = "Load or refresh canonical schools from the school fixture."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=settings.SCHOOLS_PATH,
+        )
+
+    def handle(self, *args, **options):
+        with open(options['path']) as f:
+            records = [
+                record['fields'] for record in json.load(f)
+                if record['model'] == 'app.school'
+            ]
+        with transaction.atomic():
+            existing = School.objects.in_bulk(
+                [record['name'] for record in records],
+                field_name='name',
+            )
+            created = []
+            updated = []
+            for record in records:
+                school = existing.get(record['name'])
+                if school is None:
+                    school = School(name=record['name'])
+                    created.append(school)
+                else:
+                    updated.append(school)
+                for field in SCHOOL_FIELDS:
+                    value = record.get(field)
+                    # Keep coordinates found by geocode_schools
+                    if value is None and field in LOCATION_FIELDS:
+                        value = getattr(school, field)
+                    if value is None and not School._meta.get_field(field).null:
+                        value = ''
+                    setattr(school, field, value)
+            School.objects.bulk_create(created)
+            School.objects.bulk_update(updated, SCHOOL_FIELDS)
+        clear_school_index()
+        self.stdout.write(
+            f"Created {len(created)} and updated {len(updated)} schools."
+        )
@@ -0,0 +1,69 @@
+from app.reconcile import apply_drift
+from app.reconcile import diff
+from app.reconcile import iter_auth0_users
+from app.reconcile import iter_local_users
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+
+class Command(BaseCommand):
+    help = "Diff local Users against the Auth0 tenant; --apply fixes drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--apply',
+            action='store_true',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=None,
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or settings.EXPORT_CHUNK_SIZE
+        totals = {
+            'missing_local': 0,
+            'missing_remote': 0,
+            'drift': 0,
+        }
+        batch = []
+        applied = 0
+        try:
+            entries = diff(
+                iter_auth0_users(options['page_size']),
+                iter_local_users(),
+            )
+            for kind, username, detail in entries:
+                totals[kind] += 1
+                if kind == 'missing_local':
+                    self.stdout.write(f"- {username} missing locally")
+                    continue
+                if kind == 'missing_remote':
+                    self.stdout.write(f"+ {username} missing remotely")
+                    continue
+                user_id, values, changes = detail
+                for field, (old, new) in changes.items():
+                    self.stdout.write(f"~ {username} {field}: {old!r} -> {new!r}")
+                if not options['apply']:
+                    continue
+                batch.append((user_id, values))
+                if len(batch) >= batch_size:
+                    applied += apply_drift(batch)
+                    batch = []
+        except ValueError as error:
+            # Out-of-order streams, listing caps and failed exports
+            raise CommandError(str(error))
+        if batch:
+            applied += apply_drift(batch)
+        self.stdout.write(
+            f"{totals['missing_local']} missing locally, "
+            f"{totals['missing_remote']} missing remotely, "
+            f"{totals['drift']} drifted, {applied} fixed."
+        )
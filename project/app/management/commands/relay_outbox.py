@@ -0,0 +1,17 @@
+from app.tasks import relay_outbox
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Relay pending outbox entries to RQ."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+        )
+
+    def handle(self, *args, **options):
+        total = relay_outbox(batch_size=options['batch_size'])
+        self.stdout.write(f"Relayed {total} outbox entries.")
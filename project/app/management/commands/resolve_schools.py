@@ -0,0 +1,29 @@
+from app.models import Account
+from app.schools import resolve_school_ids
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Backfill canonical school ids from free-text preferences."
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.only('id', 'schools', 'school_ids').iterator(
+            chunk_size=settings.EXPORT_CHUNK_SIZE,
+        )
+        batch = []
+        total = 0
+        for account in accounts:
+            school_ids = resolve_school_ids(account.schools)
+            if school_ids == account.school_ids:
+                continue
+            account.school_ids = school_ids
+            batch.append(account)
+            if len(batch) >= settings.EXPORT_CHUNK_SIZE:
+                Account.objects.bulk_update(batch, ['school_ids'])
+                total += len(batch)
+                batch = []
+        if batch:
+            Account.objects.bulk_update(batch, ['school_ids'])
+            total += len(batch)
+        self.stdout.write(f"Resolved schools for {total} accounts.")
@@ -0,0 +1,29 @@
+# Imported before forking so every worker starts warm
+import app.tasks  # noqa: F401
+from app.workers import supervise
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Run the workers for one pool in RQ_POOLS."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'pool',
+            choices=list(settings.RQ_POOLS),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+        )
+
+    def handle(self, *args, **options):
+        pool = settings.RQ_POOLS[options['pool']]
+        supervise(
+            queues=pool['queues'],
+            workers=options['workers'] or pool['workers'],
+            worker_class=pool.get('worker_class', settings.RQ_WORKER_CLASS),
+            max_jobs=pool.get('max_jobs', settings.RQ_MAX_JOBS),
+        )
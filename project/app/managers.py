@@ -1,6 +1,74 @@
 # # Django
+# Standard Libary
+import json
+
 # Django
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.db import models
+
+# In model field order, as Model.from_db() expects
+USER_COLUMNS = [
+    'password',
+    'last_login',
+    'id',
+    'username',
+    'data',
+    'name',
+    'email',
+    'is_active',
+    'is_admin',
+    'is_verified',
+    'created',
+    'updated',
+]
+
+# Columns refreshed from the identity provider on every login
+LOGIN_COLUMNS = [
+    'data',
+    'name',
+    'email',
+    'is_verified',
+]
+
+# One round trip: insert or conditionally update, and return the row
+# whether or not it was written, with per-column change flags.
+UPSERT_SQL = """
+WITH old AS (
+    SELECT {columns} FROM app_user WHERE username = %(username)s
+), new AS (
+    INSERT INTO app_user (
+        password, username, data, name, email,
+        is_active, is_admin, is_verified, created, updated
+    )
+    VALUES (
+        %(password)s, %(username)s, %(data)s::jsonb, %(name)s, %(email)s,
+        true, false, %(is_verified)s, now(), now()
+    )
+    ON CONFLICT (username) DO UPDATE SET
+        {assignments},
+        updated = EXCLUDED.updated
+    WHERE ({current}) IS DISTINCT FROM ({excluded})
+    RETURNING {columns}, (xmax = 0) AS inserted
+)
+SELECT {new_columns}, new.inserted, {changed}
+FROM new LEFT JOIN old ON true
+UNION ALL
+SELECT {old_columns}, false, {unchanged}
+FROM old WHERE NOT EXISTS (SELECT 1 FROM new)
+""".format(
+    columns=', '.join(USER_COLUMNS),
+    assignments=', '.join(f'{c} = EXCLUDED.{c}' for c in LOGIN_COLUMNS),
+    current=', '.join(f'app_user.{c}' for c in LOGIN_COLUMNS),
+    excluded=', '.join(f'EXCLUDED.{c}' for c in LOGIN_COLUMNS),
+    new_columns=', '.join(f'new.{c}' for c in USER_COLUMNS),
+    old_columns=', '.join(f'old.{c}' for c in USER_COLUMNS),
+    changed=', '.join(
+        f'old.{c} IS DISTINCT FROM new.{c}' for c in LOGIN_COLUMNS
+    ),
+    unchanged=', '.join('false' for c in LOGIN_COLUMNS),
+)
 
 
 class UserManager(BaseUserManager):
@@ -31,3 +99,46 @@ class UserManager(BaseUserManager):
         if extra_fields.get('is_admin') is not True:
             raise ValueError('Superuser must have is_admin=True.')
         return self.create_user(username, password, **extra_fields)
+
+    def upsert(self, username, name, email, is_verified, data):
+        """
+        Insert or update a User from identity provider claims.
+
+        Only writes the row when a login column differs.  Returns the
+        user, whether it was created, and the set of changed fields.
+        """
+        params = {
+            'username': username,
+            'password': make_password(None),
+            'data': json.dumps(data),
+            'name': name,
+            'email': email,
+            'is_verified': is_verified,
+        }
+        connection = connections[self.db]
+        with connection.cursor() as cursor:
+            cursor.execute(UPSERT_SQL, params)
+            row = cursor.fetchone()
+        if row is None:
+            # A concurrent login inserted the same row after our snapshot
+            # and nothing differed, so neither branch returned it
+            return self.get(username=username), False, set()
+        values = []
+        for column, value in zip(USER_COLUMNS, row):
+            field = self.model._meta.get_field(column)
+            if hasattr(field, 'from_db_value'):
+                value = field.from_db_value(value, None, connection)
+            values.append(value)
+        created = row[len(USER_COLUMNS)]
+        flags = row[len(USER_COLUMNS) + 1:]
+        user = self.model.from_db(self.db, USER_COLUMNS, values)
+        changed = {
+            column for column, flag in zip(LOGIN_COLUMNS, flags) if flag
+        }
+        return user, created, changed
+
+
+class AccountQuerySet(models.QuerySet):
+    def preferring(self, school):
+        # Served by the GIN index on school_ids
+        return self.filter(school_ids__contains=[school.id.id])
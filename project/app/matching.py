@@ -0,0 +1,127 @@
+# Standard Libary
+import heapq
+import math
+from operator import itemgetter
+
+# Django
+from django.conf import settings
+
+# Local
+from .models import Account
+from .models import School
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.radians(EARTH_RADIUS_KM)
+
+
+class Points:
+    """
+    Coordinates held as parallel lists in radians, with the cosine of
+    each latitude computed once so a ranking is a single pass of
+    arithmetic over the lists.
+    """
+
+    def __init__(self, rows):
+        self.ids = []
+        self.lats = []
+        self.lons = []
+        self.cos_lats = []
+        for pk, lat, lon in rows:
+            if lat is None or lon is None:
+                continue
+            lat = math.radians(lat)
+            self.ids.append(pk)
+            self.lats.append(lat)
+            self.lons.append(math.radians(lon))
+            self.cos_lats.append(math.cos(lat))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def distances(self, lat, lon):
+        lat = math.radians(lat)
+        lon = math.radians(lon)
+        cos_lat = math.cos(lat)
+        sin = math.sin
+        return [
+            2 * EARTH_RADIUS_KM * math.asin(math.sqrt(
+                sin((other_lat - lat) / 2) ** 2
+                + cos_lat * other_cos * sin((other_lon - lon) / 2) ** 2
+            ))
+            for other_lat, other_lon, other_cos in zip(
+                self.lats,
+                self.lons,
+                self.cos_lats,
+            )
+        ]
+
+    def nearest(self, lat, lon, limit=None):
+        limit = limit or settings.MATCH_LIMIT
+        return heapq.nsmallest(
+            limit,
+            zip(self.distances(lat, lon), self.ids),
+            key=itemgetter(0),
+        )
+
+
+def get_bounds(lat, lon, radius):
+    dlat = radius / KM_PER_DEGREE
+    dlon = dlat / max(math.cos(math.radians(lat)), 0.01)
+    return (lat - dlat, lat + dlat), (lon - dlon, lon + dlon)
+
+
+def get_account_point(account):
+    return account.lat, account.lon
+
+
+def get_school_points():
+    return Points(
+        School.objects.filter(
+            lat__isnull=False,
+            lon__isnull=False,
+        ).values_list('id', 'lat', 'lon')
+    )
+
+
+def get_nearest_accounts(lat, lon, limit):
+    """
+    Only accounts in a box around the point are loaded; the box doubles
+    until its limit-th nearest lies within the inscribed circle, after
+    which nothing outside can be closer.
+    """
+    radius = settings.MATCH_RADIUS_START_KM
+    while True:
+        lat_range, lon_range = get_bounds(lat, lon, radius)
+        points = Points(
+            Account.objects.filter(
+                lat__range=lat_range,
+                lon__range=lon_range,
+            ).values_list('id', 'lat', 'lon')
+        )
+        nearest = points.nearest(lat, lon, limit)
+        if len(nearest) == limit and nearest[-1][0] <= radius:
+            return nearest
+        if radius >= settings.MATCH_RADIUS_KM:
+            return nearest
+        radius = min(radius * 2, settings.MATCH_RADIUS_KM)
+
+
+def rank_schools(account, limit=None):
+    lat, lon = get_account_point(account)
+    if lat is None:
+        return []
+    return get_school_points().nearest(lat, lon, limit)
+
+
+def rank_accounts(school, limit=None):
+    if school.lat is None or school.lon is None:
+        return []
+    limit = limit or settings.MATCH_LIMIT
+    return get_nearest_accounts(school.lat, school.lon, limit)
+
+
+def get_matches(model, ranked):
+    objects = model.objects.in_bulk([pk for distance, pk in ranked])
+    return [
+        (objects[pk], distance) for distance, pk in ranked if pk in objects
+    ]
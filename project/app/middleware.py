@@ -0,0 +1,52 @@
+# Third-Party
+import brotli
+# Django
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+COMPRESSIBLE_TYPES = [
+    'text/',
+    'application/json',
+    'application/javascript',
+]
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Brotli-compress dynamic responses when accepted, else gzip.
+
+    Streaming responses (static files, exports) are left alone; they
+    are either precompressed or offer their own compression.
+    """
+    def process_response(self, request, response):
+        if response.streaming:
+            return response
+        content_type = response.get('Content-Type', '')
+        if not any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES):
+            return response
+        ae = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if not re_accepts_brotli.search(ae):
+            return super().process_response(request, response)
+        if len(response.content) < 200:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed_content = brotli.compress(
+            response.content,
+            quality=settings.BROTLI_QUALITY,
+        )
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+        # Encoded bodies only get weak validators (RFC 7232 2.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
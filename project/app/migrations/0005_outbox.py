@@ -0,0 +1,26 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:00
+
+from django.db import migrations, models
+import hashid_field.field
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_alter_account_ssn'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Outbox',
+            fields=[
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=7, prefix='', primary_key=True, serialize=False)),
+                ('operation', models.IntegerField(choices=[(10, 'Delete User'), (20, 'Delete User Email')])),
+                ('payload', models.JSONField(default=dict)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'outbox',
+            },
+        ),
+    ]
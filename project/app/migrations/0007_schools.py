@@ -0,0 +1,49 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:05
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import hashid_field.field
+import phonenumber_field.modelfields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_delta_exports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='School',
+            fields=[
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=7, prefix='', primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('level', models.IntegerField(blank=True, choices=[(10, 'Elementary'), (20, 'Middle'), (30, 'High'), (40, 'Other')], null=True)),
+                ('nces_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('low_grade', models.IntegerField(blank=True, null=True)),
+                ('high_grade', models.IntegerField(blank=True, null=True)),
+                ('grades', django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, null=True, size=None)),
+                ('address', models.CharField(blank=True, default='', max_length=255)),
+                ('city', models.CharField(blank=True, default='', max_length=255)),
+                ('state', models.CharField(blank=True, default='', max_length=255)),
+                ('zipcode', models.CharField(blank=True, default='', max_length=255)),
+                ('county', models.CharField(blank=True, default='', max_length=255)),
+                ('phone', phonenumber_field.modelfields.PhoneNumberField(blank=True, max_length=128, region=None)),
+                ('website', models.URLField(blank=True, default='')),
+                ('lat', models.FloatField(blank=True, null=True)),
+                ('lon', models.FloatField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='school_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), blank=True, default=list, editable=False, size=None),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['school_ids'], name='app_account_school__d9d1c6_gin'),
+        ),
+    ]
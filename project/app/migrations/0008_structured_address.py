@@ -0,0 +1,70 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:09
+
+from django.db import migrations, models
+import hashid_field.field
+
+
+def parse_addresses(apps, schema_editor):
+    from app.geocoding import encode_geohash
+    from app.geocoding import parse_address
+    Account = apps.get_model('app', 'Account')
+    accounts = []
+    for account in Account.objects.exclude(address='').iterator():
+        formatted, components, lat, lon = parse_address(account.address)
+        account.address = formatted
+        account.address_components = components
+        account.lat = lat
+        account.lon = lon
+        account.geohash = encode_geohash(lat, lon) if lat is not None else ''
+        accounts.append(account)
+    Account.objects.bulk_update(
+        accounts,
+        ['address', 'address_components', 'lat', 'lon', 'geohash'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_schools'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Geocode',
+            fields=[
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=7, prefix='', primary_key=True, serialize=False)),
+                ('normalized', models.CharField(max_length=512, unique=True)),
+                ('formatted', models.CharField(blank=True, default='', max_length=512)),
+                ('components', models.JSONField(blank=True, default=dict)),
+                ('lat', models.FloatField(blank=True, null=True)),
+                ('lon', models.FloatField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='address_components',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='lat',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='lon',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            parse_addresses,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_fsm
+import hashid_field.field
+
+
+def set_eligibility(apps, schema_editor):
+    Account = apps.get_model('app', 'Account')
+    Account.objects.filter(
+        is_diploma=True,
+        is_offender=False,
+    ).update(is_eligible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_structured_address'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Vacancy',
+            fields=[
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=7, prefix='', primary_key=True, serialize=False)),
+                ('state', django_fsm.FSMIntegerField(choices=[(0, 'Open'), (10, 'Filled'), (20, 'Cancelled')], default=0)),
+                ('band', models.IntegerField(choices=[(10, 'Elementary (K-5)'), (20, 'Middle (6-8)'), (30, 'High (9-12)')])),
+                ('date', models.DateField(db_index=True)),
+                ('is_certificate_required', models.BooleanField(default=False)),
+                ('notes', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'vacancies',
+            },
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='is_eligible',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(condition=models.Q(('is_eligible', True)), fields=['lat', 'lon'], name='account_eligible_point_idx'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='account',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='vacancies', to='app.account'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='school',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vacancies', to='app.school'),
+        ),
+        migrations.RunPython(
+            set_eligibility,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_dispatch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='availability',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='availability_year',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_fsm
+import hashid_field.field
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_availability'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Offer',
+            fields=[
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=7, prefix='', primary_key=True, serialize=False)),
+                ('state', django_fsm.FSMIntegerField(choices=[(0, 'Pending'), (10, 'Sent'), (20, 'Accepted'), (30, 'Expired'), (40, 'Failed')], default=0)),
+                ('token', models.CharField(max_length=32, unique=True)),
+                ('sent', models.DateTimeField(blank=True, null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='app.account')),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='app.vacancy')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='offer',
+            constraint=models.UniqueConstraint(fields=('vacancy', 'account'), name='unique_offer'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:15
+
+from django.db import migrations, models
+import django_fsm
+import hashid_field.field
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_offers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', hashid_field.field.HashidAutoField(alphabet='abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890', min_length=7, prefix='', primary_key=True, serialize=False)),
+                ('state', django_fsm.FSMIntegerField(choices=[(0, 'Draft'), (10, 'Sending'), (20, 'Sent')], default=0)),
+                ('subject', models.CharField(max_length=255)),
+                ('template', models.CharField(default='app/emails/closing.txt', max_length=255)),
+                ('html_template', models.CharField(blank=True, default='', max_length=255)),
+                ('checkpoint', models.BigIntegerField(default=0, editable=False)),
+                ('sent_count', models.IntegerField(default=0, editable=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_broadcasts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcast',
+            name='attachment',
+            field=models.FileField(blank=True, upload_to='broadcasts'),
+        ),
+    ]
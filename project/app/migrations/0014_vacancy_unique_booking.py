@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_broadcast_attachment'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='vacancy',
+            constraint=models.UniqueConstraint(condition=models.Q(('state', 10)), fields=('account', 'date'), name='unique_booking'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.9 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_vacancy_unique_booking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['lat', 'lon'], name='account_point_idx'),
+        ),
+    ]
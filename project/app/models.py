@@ -2,13 +2,16 @@
 # First-Party
 from django.contrib.auth.models import AbstractBaseUser
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django_fsm import FSMIntegerField
 from hashid_field import HashidAutoField
 from model_utils import Choices
+from model_utils import FieldTracker
 from phonenumber_field.modelfields import PhoneNumberField
 
 # Local
+from .managers import AccountQuerySet
 from .managers import UserManager
 
 
@@ -32,6 +35,29 @@ class Account(models.Model):
         blank=False,
         default='',
     )
+    # Parsed from address on save
+    address_components = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    lat = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    lon = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    geohash = models.CharField(
+        max_length=12,
+        blank=True,
+        default='',
+        editable=False,
+        db_index=True,
+    )
     email = models.EmailField(
         blank=False,
     )
@@ -63,6 +89,11 @@ class Account(models.Model):
     wasd_notes = models.TextField(
         blank=True,
     )
+    # Derived from the flags above on save, so dispatch filters on one column
+    is_eligible = models.BooleanField(
+        default=False,
+        editable=False,
+    )
     schools = ArrayField(
         models.CharField(
             max_length=255,
@@ -70,16 +101,34 @@ class Account(models.Model):
         default=list,
         blank=True,
     )
+    # Canonical School ids for the free-text schools above
+    school_ids = ArrayField(
+        models.IntegerField(),
+        default=list,
+        blank=True,
+        editable=False,
+    )
     notes = models.TextField(
         max_length=2000,
         blank=True,
         default='',
     )
+    # One bit per school day of availability_year; see app.availability
+    availability = models.BinaryField(
+        null=True,
+        blank=True,
+    )
+    availability_year = models.IntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
     created = models.DateTimeField(
         auto_now_add=True,
     )
     updated = models.DateTimeField(
         auto_now=True,
+        db_index=True,
     )
     user = models.OneToOneField(
         'app.User',
@@ -89,9 +138,337 @@ class Account(models.Model):
         unique=True,
     )
 
+    tracker = FieldTracker(fields=[
+        'state',
+        'name',
+        'address',
+        'email',
+        'phone',
+        'ssn',
+        'is_diploma',
+        'is_certificate',
+        'is_criminal',
+        'criminal_notes',
+        'is_offender',
+        'is_wasd',
+        'wasd_notes',
+        'schools',
+        'notes',
+        'user',
+    ])
+
+    objects = AccountQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(
+                fields=['school_ids'],
+            ),
+            # Matching's bounding-box scan over all accounts
+            models.Index(
+                fields=['lat', 'lon'],
+                name='account_point_idx',
+            ),
+            # Dispatch bounding-box scan over eligible volunteers only
+            models.Index(
+                fields=['lat', 'lon'],
+                condition=models.Q(is_eligible=True),
+                name='account_eligible_point_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.name}"
 
+    def get_is_eligible(self):
+        return self.is_diploma and not self.is_offender
+
+
+class Vacancy(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    STATE = Choices(
+        (0, 'open', 'Open'),
+        (10, 'filled', 'Filled'),
+        (20, 'cancelled', 'Cancelled'),
+    )
+    state = FSMIntegerField(
+        choices=STATE,
+        default=STATE.open,
+    )
+    BAND = Choices(
+        (10, 'elementary', 'Elementary (K-5)'),
+        (20, 'middle', 'Middle (6-8)'),
+        (30, 'high', 'High (9-12)'),
+    )
+    band = models.IntegerField(
+        choices=BAND,
+    )
+    date = models.DateField(
+        db_index=True,
+    )
+    is_certificate_required = models.BooleanField(
+        default=False,
+    )
+    notes = models.TextField(
+        blank=True,
+        default='',
+    )
+    school = models.ForeignKey(
+        'app.School',
+        on_delete=models.CASCADE,
+        related_name='vacancies',
+    )
+    account = models.ForeignKey(
+        'app.Account',
+        on_delete=models.SET_NULL,
+        related_name='vacancies',
+        null=True,
+        blank=True,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        verbose_name_plural = 'vacancies'
+        constraints = [
+            # One booking per volunteer per day; 10 is STATE.filled
+            models.UniqueConstraint(
+                fields=['account', 'date'],
+                condition=models.Q(state=10),
+                name='unique_booking',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.school} {self.date}"
+
+
+class Offer(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    STATE = Choices(
+        (0, 'pending', 'Pending'),
+        (10, 'sent', 'Sent'),
+        (20, 'accepted', 'Accepted'),
+        (30, 'expired', 'Expired'),
+        (40, 'failed', 'Failed'),
+    )
+    state = FSMIntegerField(
+        choices=STATE,
+        default=STATE.pending,
+    )
+    token = models.CharField(
+        max_length=32,
+        unique=True,
+    )
+    sent = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+    vacancy = models.ForeignKey(
+        'app.Vacancy',
+        on_delete=models.CASCADE,
+        related_name='offers',
+    )
+    account = models.ForeignKey(
+        'app.Account',
+        on_delete=models.CASCADE,
+        related_name='offers',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['vacancy', 'account'],
+                name='unique_offer',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.vacancy} {self.account}"
+
+
+class Broadcast(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    STATE = Choices(
+        (0, 'draft', 'Draft'),
+        (10, 'sending', 'Sending'),
+        (20, 'sent', 'Sent'),
+    )
+    state = FSMIntegerField(
+        choices=STATE,
+        default=STATE.draft,
+    )
+    subject = models.CharField(
+        max_length=255,
+    )
+    template = models.CharField(
+        max_length=255,
+        default='app/emails/closing.txt',
+    )
+    html_template = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+    )
+    attachment = models.FileField(
+        upload_to='broadcasts',
+        blank=True,
+    )
+    # Highest account number sent so far; a resumed send starts after it
+    checkpoint = models.BigIntegerField(
+        default=0,
+        editable=False,
+    )
+    sent_count = models.IntegerField(
+        default=0,
+        editable=False,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+    )
+
+    def __str__(self):
+        return f"{self.subject}"
+
+
+class Geocode(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    normalized = models.CharField(
+        max_length=512,
+        unique=True,
+    )
+    formatted = models.CharField(
+        max_length=512,
+        blank=True,
+        default='',
+    )
+    components = models.JSONField(
+        default=dict,
+        blank=True,
+    )
+    lat = models.FloatField(
+        null=True,
+        blank=True,
+    )
+    lon = models.FloatField(
+        null=True,
+        blank=True,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    def __str__(self):
+        return f"{self.formatted}"
+
+
+class School(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    LEVEL = Choices(
+        (10, 'elementary', 'Elementary'),
+        (20, 'middle', 'Middle'),
+        (30, 'high', 'High'),
+        (40, 'other', 'Other'),
+    )
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+    )
+    level = models.IntegerField(
+        choices=LEVEL,
+        null=True,
+        blank=True,
+    )
+    nces_id = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+    )
+    low_grade = models.IntegerField(
+        null=True,
+        blank=True,
+    )
+    high_grade = models.IntegerField(
+        null=True,
+        blank=True,
+    )
+    grades = ArrayField(
+        models.IntegerField(),
+        null=True,
+        blank=True,
+    )
+    address = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+    )
+    city = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+    )
+    state = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+    )
+    zipcode = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+    )
+    county = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+    )
+    phone = PhoneNumberField(
+        blank=True,
+    )
+    website = models.URLField(
+        blank=True,
+        default='',
+    )
+    lat = models.FloatField(
+        null=True,
+        blank=True,
+    )
+    lon = models.FloatField(
+        null=True,
+        blank=True,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+    )
+
+    def __str__(self):
+        return f"{self.name}"
 
 
 class User(AbstractBaseUser):
@@ -141,6 +518,15 @@ class User(AbstractBaseUser):
 
     objects = UserManager()
 
+    tracker = FieldTracker(fields=[
+        'username',
+        'name',
+        'email',
+        'is_active',
+        'is_admin',
+        'is_verified',
+    ])
+
     @property
     def is_staff(self):
         return self.is_admin
@@ -153,3 +539,67 @@ class User(AbstractBaseUser):
 
     def has_module_perms(self, app_label):
         return True
+
+
+class Outbox(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    OPERATION = Choices(
+        (10, 'delete_user', 'Delete User'),
+        (20, 'delete_user_email', 'Delete User Email'),
+    )
+    operation = models.IntegerField(
+        choices=OPERATION,
+    )
+    payload = models.JSONField(
+        default=dict,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name_plural = 'outbox'
+
+    def __str__(self):
+        return f"{self.get_operation_display()}"
+
+
+class Tombstone(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    account_id = models.CharField(
+        max_length=100,
+    )
+    deleted = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+    )
+
+    def __str__(self):
+        return f"{self.account_id}"
+
+
+class ExportCursor(models.Model):
+    id = HashidAutoField(
+        primary_key=True,
+    )
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+    )
+    watermark = models.DateTimeField(
+        null=True,
+        blank=True,
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+    )
+    updated = models.DateTimeField(
+        auto_now=True,
+    )
+
+    def __str__(self):
+        return f"{self.name}"
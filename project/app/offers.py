@@ -0,0 +1,138 @@
+# Standard Libary
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Django
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Exists
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+# Local
+from .models import Offer
+from .models import Vacancy
+
+log = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Spaces calls out to at most rate per second, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self.lock = threading.Lock()
+        self.next = time.monotonic()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next - now
+            self.next = max(now, self.next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+        return
+
+
+class Channel:
+    def __init__(self, rate, concurrency):
+        self.limiter = RateLimiter(rate)
+        self.semaphore = threading.BoundedSemaphore(concurrency)
+
+    def call(self, func, *args):
+        with self.semaphore:
+            self.limiter.wait()
+            try:
+                return bool(func(*args))
+            except Exception:
+                log.exception('offer delivery failed')
+                return False
+
+
+def get_channels():
+    return {
+        name: Channel(**options)
+        for name, options in settings.OFFER_CHANNELS.items()
+    }
+
+
+def fan_out(sends):
+    """
+    Run (channel, func, *args) sends in parallel and return whether each
+    succeeded, in order.  The pool bounds total concurrency; each channel
+    adds its own cap and rate.
+    """
+    channels = get_channels()
+    with ThreadPoolExecutor(max_workers=settings.OFFER_CONCURRENCY) as executor:
+        futures = [
+            executor.submit(channels[channel].call, func, *args)
+            for channel, func, *args in sends
+        ]
+        return [future.result() for future in futures]
+
+
+def create_offers(vacancy, account_ids):
+    Offer.objects.bulk_create(
+        [
+            Offer(
+                vacancy=vacancy,
+                account_id=account_id,
+                token=get_random_string(32),
+            ) for account_id in account_ids
+        ],
+        # Re-running dispatch leaves earlier offers alone
+        ignore_conflicts=True,
+    )
+    return Offer.objects.filter(
+        vacancy=vacancy,
+        account_id__in=account_ids,
+        state=Offer.STATE.pending,
+    ).select_related('account')
+
+
+def claim_offer(offer):
+    """
+    First accept wins.  The vacancy is filled by one conditional UPDATE,
+    so concurrent accepts can't both succeed, and a volunteer already
+    booked that day can't take it.  The unique_booking constraint backs
+    that up when two of their accepts race.
+    """
+    now = timezone.now()
+    vacancy = Vacancy.objects.only('date').get(pk=offer.vacancy_id)
+    booked = Vacancy.objects.filter(
+        account=offer.account_id,
+        date=vacancy.date,
+        state=Vacancy.STATE.filled,
+    )
+    try:
+        with transaction.atomic():
+            claimed = Vacancy.objects.filter(
+                pk=offer.vacancy_id,
+                state=Vacancy.STATE.open,
+            ).exclude(
+                Exists(booked),
+            ).update(
+                state=Vacancy.STATE.filled,
+                account=offer.account_id,
+                updated=now,
+            )
+            if not claimed:
+                return False
+            Offer.objects.filter(pk=offer.pk).update(
+                state=Offer.STATE.accepted,
+                updated=now,
+            )
+            Offer.objects.filter(
+                vacancy_id=offer.vacancy_id,
+            ).exclude(
+                pk=offer.pk,
+            ).update(
+                state=Offer.STATE.expired,
+                updated=now,
+            )
+    except IntegrityError:
+        return False
+    return True
@@ -0,0 +1,43 @@
+# Django
+from django.conf import settings
+from django_rq import get_queue
+from django_rq import job as rq_job
+from rq import Worker
+from rq.registry import StartedJobRegistry
+from rq.utils import utcnow
+
+
+def job(queue_name, **kwargs):
+    """
+    django_rq's job decorator, with the queue kept on the function so
+    callers other than .delay (relays, dedupe) route the same way.
+    """
+    def decorator(func):
+        func = rq_job(queue_name, **kwargs)(func)
+        func.queue_name = queue_name
+        return func
+    return decorator
+
+
+def get_latency(queue):
+    # Age of the oldest waiting job; what the next job will have waited
+    job_ids = queue.get_job_ids(0, 0)
+    if not job_ids:
+        return 0
+    oldest = queue.fetch_job(job_ids[0])
+    if not oldest or not oldest.enqueued_at:
+        return 0
+    return round((utcnow() - oldest.enqueued_at).total_seconds(), 3)
+
+
+def get_queue_stats():
+    stats = {}
+    for name in settings.RQ_QUEUES:
+        queue = get_queue(name)
+        stats[name] = {
+            'depth': queue.count,
+            'latency': get_latency(queue),
+            'started': StartedJobRegistry(queue=queue).count,
+            'workers': Worker.count(queue=queue),
+        }
+    return stats
@@ -0,0 +1,112 @@
+# Standard Libary
+import time
+
+# Django
+from django.conf import settings
+from django_redis import get_redis_connection
+
+# Tokens are counted as of a stamp and refilled lazily.  A negative
+# count is a queue of reservations: each caller takes a token up front
+# and sleeps off the deficit, so waiters go out evenly spaced at the
+# rate instead of stampeding when tokens return.  Time is Redis's, so
+# every worker agrees on it.
+RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] + clock[2] / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - stamp) * rate) - 1
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+# The API's own count wins when it is lower; other clients of the same
+# tenant spend from it too.  Once spent, nothing refills until reset.
+OBSERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local remaining = tonumber(ARGV[3])
+local reset = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = clock[1] + clock[2] / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+local tokens = tonumber(state[1]) or capacity
+local stamp = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - stamp) * rate, remaining)
+stamp = now
+if remaining < 1 and reset > now then
+    tokens = math.min(tokens, 0)
+    stamp = reset
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', stamp)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate + math.max(0, stamp - now)) + 60)
+return 1
+"""
+
+
+def get_header(headers, name):
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    A token bucket kept in Redis, so all workers share one budget per
+    API.  wait() blocks for a token rather than failing; observe() folds
+    in the X-RateLimit-* headers of each response.
+    """
+
+    def __init__(self, name, rate, capacity, connection=None):
+        self.key = f'ratelimit:{name}'
+        self.rate = rate
+        self.capacity = capacity
+        connection = connection or get_redis_connection('default')
+        self.reserve_script = connection.register_script(RESERVE_SCRIPT)
+        self.observe_script = connection.register_script(OBSERVE_SCRIPT)
+
+    def reserve(self):
+        """Take a token; returns the seconds to wait before using it."""
+        return float(self.reserve_script(
+            keys=[self.key],
+            args=[self.rate, self.capacity],
+        ))
+
+    def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def observe(self, response):
+        headers = response.headers
+        remaining = get_header(headers, 'X-RateLimit-Remaining')
+        reset = get_header(headers, 'X-RateLimit-Reset')
+        if response.status_code == 429:
+            remaining = 0
+            if reset is None:
+                retry_after = get_header(headers, 'Retry-After') or 1 / self.rate
+                reset = time.time() + retry_after
+        if remaining is None:
+            return
+        self.observe_script(
+            keys=[self.key],
+            args=[self.rate, self.capacity, remaining, reset or 0],
+        )
+        return
+
+
+def get_auth0_limiter():
+    return TokenBucket(
+        'auth0',
+        rate=settings.AUTH0_RATE_LIMIT,
+        capacity=settings.AUTH0_RATE_BURST,
+    )
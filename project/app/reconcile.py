@@ -0,0 +1,198 @@
+# Standard Libary
+import gzip
+import json
+import time
+from operator import itemgetter
+
+# Django
+from django.conf import settings
+from django.db.models.functions import Collate
+from django.utils import timezone
+
+# Local
+from .models import User
+from .tasks import auth0_request
+from .transport import get_session
+
+# Most users GET /users will page through
+AUTH0_SEARCH_LIMIT = 1000
+
+# Local field to Auth0 attribute, as the login backend maps them
+USER_FIELDS = {
+    'name': 'name',
+    'email': 'email',
+    'is_verified': 'email_verified',
+}
+
+
+def get_auth0_fields():
+    return ['user_id', *USER_FIELDS.values()]
+
+
+def get_auth0_total():
+    response = auth0_request('GET', 'users', params={
+        'page': 0,
+        'per_page': 1,
+        'fields': 'user_id',
+        'include_totals': 'true',
+    })
+    response.raise_for_status()
+    return response.json()['total']
+
+
+def iter_paged_users(page_size):
+    page = 0
+    while True:
+        # The search behind /users stops serving past its cap
+        if page * page_size >= AUTH0_SEARCH_LIMIT:
+            raise ValueError(
+                f'Auth0 lists at most {AUTH0_SEARCH_LIMIT} users; use an export',
+            )
+        response = auth0_request('GET', 'users', params={
+            'page': page,
+            'per_page': page_size,
+            'sort': 'user_id:1',
+            'fields': ','.join(get_auth0_fields()),
+            'include_fields': 'true',
+        })
+        response.raise_for_status()
+        users = response.json()
+        yield from users
+        if len(users) < page_size:
+            return
+        page += 1
+
+
+def export_auth0_users():
+    """
+    All tenant users through a user-export job, sorted by user_id.
+
+    Exports arrive unordered, so they are sorted in memory; only the
+    synced fields are requested to keep that small.
+    """
+    response = auth0_request('POST', 'jobs/users-exports', json={
+        'format': 'json',
+        'fields': [{'name': field} for field in get_auth0_fields()],
+    })
+    response.raise_for_status()
+    job = response.json()
+    deadline = time.monotonic() + settings.AUTH0_EXPORT_TIMEOUT
+    while job['status'] in ('pending', 'processing'):
+        if time.monotonic() > deadline:
+            raise ValueError(f"Auth0 export {job['id']} timed out")
+        time.sleep(settings.AUTH0_EXPORT_POLL_INTERVAL)
+        response = auth0_request('GET', f"jobs/{job['id']}")
+        response.raise_for_status()
+        job = response.json()
+    if job['status'] != 'completed':
+        raise ValueError(f"Auth0 export {job['id']} {job['status']}")
+    response = get_session().get(job['location'])
+    response.raise_for_status()
+    # Gzipped, one JSON object per line
+    users = [
+        json.loads(line)
+        for line in gzip.decompress(response.content).splitlines()
+        if line.strip()
+    ]
+    users.sort(key=itemgetter('user_id'))
+    return users
+
+
+def iter_auth0_users(page_size=None):
+    """Every tenant user, in user_id order."""
+    page_size = page_size or settings.AUTH0_RECONCILE_PAGE_SIZE
+    if get_auth0_total() > AUTH0_SEARCH_LIMIT:
+        return iter(export_auth0_users())
+    return iter_paged_users(page_size)
+
+
+def iter_local_users():
+    # Byte order, to match the tenant's; the default collation differs
+    return User.objects.filter(
+        username__contains='|',
+    ).order_by(
+        Collate('username', 'C'),
+    ).values_list(
+        'id',
+        'username',
+        *USER_FIELDS,
+    ).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def check_order(usernames):
+    previous = None
+    for username, row in usernames:
+        if previous is not None and username <= previous:
+            raise ValueError(f'{username} is out of order after {previous}')
+        previous = username
+        yield username, row
+
+
+def merge(remote, local):
+    """
+    Merge-join two streams sorted by username.  Yields (username,
+    remote, local), with None on whichever side is missing.
+    """
+    remote = check_order((user['user_id'], user) for user in remote)
+    local = check_order((row[1], row) for row in local)
+    sentinel = (None, None)
+    remote_username, remote_user = next(remote, sentinel)
+    local_username, local_row = next(local, sentinel)
+    while remote_username is not None or local_username is not None:
+        if local_username is None or (
+            remote_username is not None and remote_username < local_username
+        ):
+            yield remote_username, remote_user, None
+            remote_username, remote_user = next(remote, sentinel)
+        elif remote_username is None or local_username < remote_username:
+            yield local_username, None, local_row
+            local_username, local_row = next(local, sentinel)
+        else:
+            yield local_username, remote_user, local_row
+            remote_username, remote_user = next(remote, sentinel)
+            local_username, local_row = next(local, sentinel)
+
+
+def get_remote_values(remote_user):
+    # Auth0 is the source of truth, as in update_user
+    return {
+        'name': remote_user.get('name') or '',
+        'email': remote_user.get('email') or '',
+        'is_verified': bool(remote_user.get('email_verified')),
+    }
+
+
+def diff(remote, local):
+    """
+    Yields (kind, username, detail) where kind is missing_local,
+    missing_remote or drift.  Drift details are (id, values, changes).
+    """
+    for username, remote_user, local_row in merge(remote, local):
+        if local_row is None:
+            yield 'missing_local', username, None
+        elif remote_user is None:
+            yield 'missing_remote', username, None
+        else:
+            local_values = dict(zip(USER_FIELDS, local_row[2:]))
+            values = get_remote_values(remote_user)
+            changes = {
+                field: (local_values[field], value)
+                for field, value in values.items()
+                if value != local_values[field]
+            }
+            if changes:
+                yield 'drift', username, (local_row[0], values, changes)
+
+
+def apply_drift(batch):
+    """
+    Bulk update (id, values) pairs.  Every synced field is written, so
+    rows built from ids alone can't clobber anything.  Signals are
+    skipped, so nothing echoes back to Auth0.
+    """
+    now = timezone.now()
+    users = [
+        User(id=user_id, updated=now, **values) for user_id, values in batch
+    ]
+    User.objects.bulk_update(users, [*USER_FIELDS, 'updated'])
+    return len(users)
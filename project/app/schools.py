@@ -0,0 +1,149 @@
+# Standard Libary
+import re
+from collections import Counter
+
+# Django
+from django.conf import settings
+
+# Local
+from .models import School
+
+# Shorthand volunteers use for the level words
+ABBREVIATIONS = {
+    'elem': 'elementary',
+    'el': 'elementary',
+    'es': 'elementary',
+    'ms': 'middle',
+    'hs': 'high',
+    'jr': 'junior',
+    'sr': 'senior',
+    'acad': 'academy',
+}
+
+# Left out of keys and acronyms
+STOPWORDS = {
+    'school',
+    'of',
+    'the',
+    'and',
+}
+
+_index = None
+
+
+def tokenize(name):
+    return re.findall(r'[a-z0-9]+', name.lower().replace('&', ' and '))
+
+
+def normalize(name):
+    tokens = [ABBREVIATIONS.get(token, token) for token in tokenize(name)]
+    return ' '.join(token for token in tokens if token not in STOPWORDS)
+
+
+def get_acronyms(name):
+    # With and without the trailing "school": RVES and RVE
+    tokens = [
+        token for token in tokenize(name)
+        if token == 'school' or token not in STOPWORDS
+    ]
+    full = ''.join(token[0] for token in tokens)
+    short = ''.join(token[0] for token in tokens if token != 'school')
+    return {full, short}
+
+
+def get_trigrams(key):
+    padded = f'  {key} '
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class SchoolIndex:
+    """
+    In-memory lookup from free text to School ids.
+
+    Tries the normalized name, then acronyms (eg, RVES), then trigram
+    similarity for typos.  Ambiguous or weak matches resolve to None.
+    """
+
+    def __init__(self, schools, threshold=0.5, margin=0.15):
+        self.threshold = threshold
+        self.margin = margin
+        self.keys = {}
+        self.acronyms = {}
+        self.trigrams = {}
+        self.postings = {}
+        ambiguous = set()
+        for school_id, name in schools:
+            key = normalize(name)
+            self.keys[key] = school_id
+            for acronym in get_acronyms(name):
+                if len(acronym) < 2:
+                    continue
+                if acronym in self.acronyms and self.acronyms[acronym] != school_id:
+                    ambiguous.add(acronym)
+                self.acronyms[acronym] = school_id
+            grams = get_trigrams(key)
+            self.trigrams[school_id] = sum(grams.values())
+            for gram, count in grams.items():
+                self.postings.setdefault(gram, []).append((school_id, count))
+        for acronym in ambiguous:
+            del self.acronyms[acronym]
+
+    def resolve(self, text):
+        key = normalize(text)
+        if not key:
+            return None
+        if key in self.keys:
+            return self.keys[key]
+        compact = key.replace(' ', '')
+        if compact in self.acronyms:
+            return self.acronyms[compact]
+        grams = get_trigrams(key)
+        shared = Counter()
+        for gram, count in grams.items():
+            for school_id, school_count in self.postings.get(gram, ()):
+                shared[school_id] += min(count, school_count)
+        if not shared:
+            return None
+        size = sum(grams.values())
+        scores = sorted(
+            (
+                (2 * common / (size + self.trigrams[school_id]), school_id)
+                for school_id, common in shared.items()
+            ),
+            reverse=True,
+        )
+        best, school_id = scores[0]
+        if best < self.threshold:
+            return None
+        # "Meridian" alone could be any of several schools
+        if len(scores) > 1 and best - scores[1][0] < self.margin:
+            return None
+        return school_id
+
+
+def get_school_index():
+    global _index
+    # Built once per process; schools only change on release
+    if _index is None:
+        schools = School.objects.values_list('id', 'name')
+        _index = SchoolIndex(
+            [(school_id.id, name) for school_id, name in schools],
+            threshold=settings.SCHOOL_MATCH_THRESHOLD,
+            margin=settings.SCHOOL_MATCH_MARGIN,
+        )
+    return _index
+
+
+def clear_school_index():
+    global _index
+    _index = None
+    return
+
+
+def resolve_school_ids(names):
+    if not names:
+        return []
+    index = get_school_index()
+    school_ids = {index.resolve(name) for name in names}
+    school_ids.discard(None)
+    return sorted(school_ids)
@@ -1,35 +1,117 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
 from django.db.models.signals import post_save
 from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_save
 from django.dispatch import receiver
 
+from .caching import invalidate_tags
+from .geocoding import apply_address
 from .models import Account
+from .models import Outbox
+from .models import School
+from .models import Tombstone
 from .models import User
+from .schools import clear_school_index
+from .schools import resolve_school_ids
+from .tasks import ACCOUNT_SYNC_FIELDS
+from .tasks import USER_SYNC_FIELDS
+from .tasks import adjust_account_total
 from .tasks import create_account
-from .tasks import delete_user
-from .tasks import delete_user_email
-from .tasks import send_confirmation
+from .tasks import delay_unique
+from .tasks import geocode_account
+from .tasks import schedule_outbox_relay
 from .tasks import update_auth0
 from .tasks import update_user_from_account
 
 
+def get_changed_fields(instance, update_fields):
+    changed = set(instance.tracker.changed())
+    # Saves that bypass the tracker (eg, the login upsert) name their fields
+    if update_fields is not None:
+        changed |= set(update_fields)
+    return changed
+
+
 @receiver(pre_delete, sender=User)
 def delete_auth0(sender, instance, **kwargs):
-    delete_user(instance.username)
-    delete_user_email(instance.email)
+    # Written in the delete's transaction; relayed to RQ after commit
+    Outbox.objects.bulk_create([
+        Outbox(
+            operation=Outbox.OPERATION.delete_user,
+            payload={'user_id': instance.username},
+        ),
+        Outbox(
+            operation=Outbox.OPERATION.delete_user_email,
+            payload={'email_address': instance.email},
+        ),
+    ])
+    schedule_outbox_relay()
     return
 
 
+@receiver(pre_save, sender=Account)
+def account_pre_save(sender, instance, **kwargs):
+    if instance._state.adding or instance.tracker.has_changed('schools'):
+        instance.school_ids = resolve_school_ids(instance.schools)
+    if instance._state.adding or instance.tracker.has_changed('address'):
+        apply_address(instance)
+    instance.is_eligible = instance.get_is_eligible()
+    return
+
 @receiver(post_save, sender=Account)
-def account_post_save(sender, instance, created, **kwargs):
+def account_post_save(sender, instance, created, update_fields, **kwargs):
+    if instance.address and instance.lat is None:
+        if created or instance.tracker.has_changed('address'):
+            transaction.on_commit(
+                lambda: delay_unique(geocode_account, str(instance.id)),
+            )
     if created:
+        transaction.on_commit(lambda: adjust_account_total(1))
+        transaction.on_commit(lambda: invalidate_tags('accounts'))
+        return
+    if not instance.user_id:
+        return
+    changed = get_changed_fields(instance, update_fields) & ACCOUNT_SYNC_FIELDS
+    if not changed:
         return
-    update_user_from_account.delay(instance)
+    # Hashid strings only; the job reads the committed row
+    transaction.on_commit(
+        lambda: delay_unique(update_user_from_account, str(instance.id)),
+    )
     return
 
 @receiver(post_save, sender=User)
-def user_post_save(sender, instance, created, **kwargs):
+def user_post_save(sender, instance, created, update_fields, **kwargs):
     if created:
         create_account(instance)
         return
-    update_auth0.delay(instance)
+    changed = get_changed_fields(instance, update_fields) & USER_SYNC_FIELDS
+    # Values Auth0 just gave us (login, update_user) aren't sent back
+    data = instance.data or {}
+    changed = {
+        field for field in changed if getattr(instance, field) != data.get(field)
+    }
+    if not changed:
+        return
+    transaction.on_commit(
+        lambda: delay_unique(update_auth0, str(instance.id)),
+    )
+    return
+
+@receiver(post_delete, sender=Account)
+def account_post_delete(sender, instance, **kwargs):
+    # Lets delta exports report the deletion
+    Tombstone.objects.create(
+        account_id=str(instance.id),
+    )
+    transaction.on_commit(lambda: adjust_account_total(-1))
+    transaction.on_commit(lambda: invalidate_tags('accounts'))
+    return
+
+@receiver(post_save, sender=School)
+@receiver(post_delete, sender=School)
+def school_changed(sender, instance, **kwargs):
+    # Only this process; the others pick it up on restart
+    clear_school_index()
     return
@@ -0,0 +1,33 @@
+# Standard Libary
+import logging
+
+# Django
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+log = logging.getLogger(__name__)
+
+# Messages sent through LocalSMSBackend, like mail.outbox
+outbox = []
+
+
+class LocalSMSBackend:
+    """Stand-in that keeps messages in memory; for development and tests."""
+
+    def send(self, to, body):
+        outbox.append((str(to), body))
+        return True
+
+
+class ConsoleSMSBackend:
+    def send(self, to, body):
+        log.info('sms to %s: %s', to, body)
+        return True
+
+
+def get_sms_backend():
+    return import_string(settings.SMS_BACKEND)()
+
+
+def send_sms(to, body):
+    return get_sms_backend().send(to, body)
@@ -1,32 +1,42 @@
-$(function () {
-    $('input.address').each(function () {
-        var self = $(this);
-        var cmps = $('#' + self.attr('name') + '_components');
-        var fmtd = $('input[name="' + self.attr('name') + '_formatted"]');
-        self.geocomplete({
-            details: cmps,
-            detailsAttribute: 'data-geo'
-        }).change(function () {
-            if (self.val() != fmtd.val()) {
-                var cmp_names = [
-                    'country',
-                    'country_code',
-                    'locality',
-                    'postal_code',
-                    'postal_town',
-                    'route',
-                    'street_number',
-                    'state',
-                    'state_code',
-                    'formatted',
-                    'latitude',
-                    'longitude',
-                ];
+(function () {
+    var DELAY = 250;
 
-                for (var ii = 0; ii < cmp_names.length; ++ii) {
-                    $('input[name="' + self.attr('name') + '_' + cmp_names[ii] + '"]').val('');
+    function attach(input) {
+        var list = document.getElementById(input.getAttribute('list'));
+        var timer = null;
+        var controller = null;
+        var last = '';
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () {
+                var q = input.value.trim();
+                if (q.length < 3 || q === last) {
+                    return;
                 }
-            }
+                last = q;
+                // Drop the in-flight request; only the latest matters
+                if (controller) {
+                    controller.abort();
+                }
+                controller = new AbortController();
+                fetch(input.dataset.url + '?q=' + encodeURIComponent(q), {
+                    credentials: 'same-origin',
+                    signal: controller.signal
+                }).then(function (response) {
+                    return response.json();
+                }).then(function (data) {
+                    list.innerHTML = '';
+                    data.results.forEach(function (address) {
+                        var option = document.createElement('option');
+                        option.value = address;
+                        list.appendChild(option);
+                    });
+                }).catch(function () {});
+            }, DELAY);
         });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('input.address').forEach(attach);
     });
-});
\ No newline at end of file
+})();
@@ -1,81 +1,178 @@
 # Standard Libary
+import base64
 import csv
+import mimetypes
+import time
+from email.mime.base import MIMEBase
+from functools import lru_cache
 
-import requests
-# First-Party
-from auth0.v3.authentication import GetToken
-from auth0.v3.exceptions import Auth0Error
-from auth0.v3.management import Auth0
 # Django
 from django.conf import settings
+from django.core.cache import cache
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import IntegerField
+from django.db.models.functions import Cast
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.crypto import get_random_string
-from django_rq import job
+from django_rq import get_queue
+from rq import Queue
+from rq import Retry
 
+from .dispatch import get_candidates
+from .exports import iter_account_rows
+from .geocoding import geocode
+from .geocoding import set_location
 from .models import Account
+from .models import Broadcast
+from .models import Offer
+from .models import Outbox
 from .models import User
-
+from .models import Vacancy
+from .offers import create_offers
+from .offers import fan_out
+from .queues import job
+from .ratelimit import get_auth0_limiter
+from .sms import send_sms
+from .transport import get_session
 
 # Auth0
+AUTH0_TOKEN_KEY = 'auth0:token'
+
+def fetch_auth0_token():
+    payload = {
+        'client_id': settings.AUTH0_CLIENT_ID,
+        'client_secret': settings.AUTH0_CLIENT_SECRET,
+        'audience': f'https://{settings.AUTH0_TENANT}/api/v2/',
+        'grant_type': 'client_credentials',
+    }
+    response = get_session().post(
+        f'https://{settings.AUTH0_TENANT}/oauth/token',
+        json=payload,
+    )
+    response.raise_for_status()
+    return response.json()
+
 def get_auth0_token():
-    get_token = GetToken(settings.AUTH0_TENANT)
-    token = get_token.client_credentials(
-        settings.AUTH0_CLIENT_ID,
-        settings.AUTH0_CLIENT_SECRET,
-        f'https://{settings.AUTH0_TENANT}/api/v2/',
+    token = cache.get(AUTH0_TOKEN_KEY)
+    if token:
+        incr_auth0_token_stat('hits')
+        return token
+    # Single-flight refresh so a burst of workers makes one exchange
+    lock = cache.lock(
+        f'{AUTH0_TOKEN_KEY}:lock',
+        timeout=settings.AUTH0_TOKEN_LOCK_TIMEOUT,
+    )
+    acquired = lock.acquire(
+        blocking_timeout=settings.AUTH0_TOKEN_LOCK_TIMEOUT,
     )
+    try:
+        token = cache.get(AUTH0_TOKEN_KEY)
+        if token:
+            incr_auth0_token_stat('hits')
+            return token
+        incr_auth0_token_stat('misses')
+        token = fetch_auth0_token()
+        timeout = token['expires_in'] - settings.AUTH0_TOKEN_LEEWAY
+        if timeout > 0:
+            cache.set(AUTH0_TOKEN_KEY, token, timeout)
+    finally:
+        if acquired:
+            lock.release()
     return token
 
-def get_auth0_client():
-    token = get_auth0_token()
-    client = Auth0(
-        settings.AUTH0_TENANT,
-        token['access_token'],
-    )
-    return client
+def clear_auth0_token():
+    cache.delete(AUTH0_TOKEN_KEY)
+    return
 
-def get_user_data(user_id):
-    client = get_auth0_client()
-    data = client.users.get(user_id)
-    return data
+def incr_auth0_token_stat(name):
+    key = f'{AUTH0_TOKEN_KEY}:{name}'
+    cache.add(key, 0, timeout=None)
+    return cache.incr(key)
 
-def put_auth0_payload(endpoint, payload):
+def get_auth0_token_stats():
+    names = ['hits', 'misses']
+    values = cache.get_many([f'{AUTH0_TOKEN_KEY}:{name}' for name in names])
+    return {
+        name: values.get(f'{AUTH0_TOKEN_KEY}:{name}', 0) for name in names
+    }
+
+def auth0_request(method, endpoint, **kwargs):
     token = get_auth0_token()
     access_token = token['access_token']
     headers = {
         'Authorization': f'Bearer {access_token}',
     }
-    response = requests.put(
-        f'https://{settings.AUTH0_TENANT}/api/v2/{endpoint}',
-        headers=headers,
-        json=payload,
-    )
+    limiter = get_auth0_limiter()
+    for _ in range(settings.AUTH0_RATE_RETRIES + 1):
+        limiter.wait()
+        response = get_session().request(
+            method,
+            f'https://{settings.AUTH0_TENANT}/api/v2/{endpoint}',
+            headers=headers,
+            **kwargs,
+        )
+        limiter.observe(response)
+        # Throttled; the limiter now holds every worker until the reset
+        if response.status_code != 429:
+            break
+    if response.status_code == 401:
+        # Revoked or rotated; make the next call fetch a fresh token
+        clear_auth0_token()
     return response
 
-@job
-def update_auth0(user):
-    if not user.username.startswith('auth0|'):
-        return
-    client = get_auth0_client()
-    payload = {
-        'name': user.name,
-    }
-    response = client.users.update(user.username, payload)
+def get_user_data(user_id):
+    response = auth0_request('GET', f'users/{user_id}')
+    response.raise_for_status()
+    return response.json()
+
+def put_auth0_payload(endpoint, payload):
+    response = auth0_request('PUT', endpoint, json=payload)
     return response
 
-@job
-def update_user_from_account(account):
+# Fields mirrored by the sync jobs; read fresh when the job runs
+ACCOUNT_SYNC_FIELDS = {
+    'name',
+}
+
+USER_SYNC_FIELDS = {
+    'name',
+}
+
+@job('auth0')
+def update_auth0(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if not user or not user.username.startswith('auth0|'):
+        return
+    payload = {field: getattr(user, field) for field in USER_SYNC_FIELDS}
+    response = auth0_request('PATCH', f'users/{user.username}', json=payload)
+    response.raise_for_status()
+    return response.json()
+
+@job('interactive')
+def update_user_from_account(account_id):
+    account = Account.objects.select_related('user').filter(pk=account_id).first()
+    if not account or not account.user:
+        return
     user = account.user
     if not user.username.startswith('auth0|'):
         return
-    user.name = account.name
-    user.save()
+    changed = [
+        field for field in ACCOUNT_SYNC_FIELDS
+        if getattr(user, field) != getattr(account, field)
+    ]
+    if not changed:
+        return user
+    for field in changed:
+        setattr(user, field, getattr(account, field))
+    user.save(update_fields=[*changed, 'updated'])
     return user
 
-@job
+@job('auth0')
 def create_auth0_user(name, email):
-    client = get_auth0_client()
     password = get_random_string()
     data = {
         'connection': 'Username-Password-Authentication',
@@ -83,24 +180,27 @@ def create_auth0_user(name, email):
         'email': email,
         'password': password,
     }
-    try:
-        response = client.users.create(
-            data,
-        )
-    except Auth0Error:
+    response = auth0_request('POST', 'users', json=data)
+    # Already there; throttling and outages fail so RQ records them
+    if response.status_code == 409:
         return
-    default = {
+    response.raise_for_status()
+    response = response.json()
+    defaults = {
         'name': name,
         'email': email,
     }
-    user, created= User.objects.update_or_create(
+    user, created = User.objects.update_or_create(
         username=response['user_id'],
-        default=default,
+        defaults=defaults,
     )
-    return
+    return user
 
-@job
-def update_user(user):
+@job('auth0')
+def update_user(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if not user:
+        return
     data = get_user_data(user.username)
     user.data = data
     user.name = data.get('name', '')
@@ -113,11 +213,78 @@ def update_user(user):
     return user
 
 
-@job
+@job('auth0')
 def delete_user(user_id):
-    client = get_auth0_client()
-    response = client.users.delete(user_id)
-    return response
+    response = auth0_request('DELETE', f'users/{user_id}')
+    # Outbox delivery is at-least-once; a repeat delete is a no-op
+    if response.status_code == 404:
+        return response.status_code
+    response.raise_for_status()
+    return response.status_code
+
+# Counters
+ACCOUNT_TOTAL_KEY = 'account:total'
+ACCOUNT_TOTAL_FRESH_KEY = 'account:total:fresh'
+
+def get_account_total():
+    """
+    The last known count; None until first reconciled.  Pages never
+    count the table themselves; a lapsed marker queues one recount,
+    however many requests see it.
+    """
+    total = cache.get(ACCOUNT_TOTAL_KEY)
+    stale = cache.add(
+        ACCOUNT_TOTAL_FRESH_KEY,
+        True,
+        settings.ACCOUNT_TOTAL_TTL,
+    )
+    if total is None or stale:
+        delay_unique(reconcile_account_total)
+    return total
+
+@job('bulk')
+def reconcile_account_total():
+    total = Account.objects.count()
+    cache.set(ACCOUNT_TOTAL_KEY, total, timeout=None)
+    return total
+
+def adjust_account_total(delta):
+    try:
+        cache.incr(ACCOUNT_TOTAL_KEY, delta)
+    except ValueError:
+        # Not seeded; the next read reconciles
+        pass
+    return
+
+
+# Geocoding
+@job(
+    'interactive',
+    retry=Retry(
+        max=settings.GEOCODE_RETRIES,
+        interval=settings.GEOCODE_RETRY_INTERVALS,
+    ),
+)
+def geocode_account(account_id):
+    account = Account.objects.get(pk=account_id)
+    if not account.address or account.lat is not None:
+        return
+    cached = geocode(account.address)
+    if cached.lat is None:
+        return
+    set_location(account, cached.components, cached.lat, cached.lon)
+    # Skip if the address was edited while this was queued
+    Account.objects.filter(
+        pk=account_id,
+        address=account.address,
+    ).update(
+        address_components=account.address_components,
+        lat=account.lat,
+        lon=account.lon,
+        geohash=account.geohash,
+    )
+    return account
+
 
 # User
 def create_account(user):
@@ -130,10 +297,71 @@ def create_account(user):
 
 
 # Utility
+def get_job_id(func, *args):
+    return ':'.join([func.__name__, *(str(arg) for arg in args)])
+
+def delay_unique(func, *args):
+    """
+    Enqueue func(*args) unless the same call is already waiting.
+
+    The job id is derived from the call, so repeats collapse into the
+    pending job.  A job already running may have read stale rows, so a
+    follow-up is queued under a fresh id.  The check and the enqueue
+    hold a lock on the id, so concurrent callers can't both enqueue it.
+    """
+    job_id = get_job_id(func, *args)
+    queue = get_queue(func.queue_name)
+    lock = queue.connection.lock(
+        f'rq:unique:{job_id}',
+        timeout=settings.RQ_UNIQUE_LOCK_TIMEOUT,
+    )
+    acquired = lock.acquire(
+        blocking_timeout=settings.RQ_UNIQUE_LOCK_TIMEOUT,
+    )
+    try:
+        existing = queue.fetch_job(job_id)
+        if existing:
+            status = existing.get_status(refresh=False)
+            if status in ('queued', 'deferred', 'scheduled'):
+                return existing
+            if status == 'started':
+                job_id = f'{job_id}:{get_random_string(8)}'
+        return func.delay(*args, job_id=job_id)
+    finally:
+        if acquired:
+            lock.release()
+
+@lru_cache(maxsize=None)
+def get_email_template(name):
+    # Compiled once per worker; rendering is then per recipient only
+    return get_template(name)
+
+def load_attachment(filename, content, mimetype):
+    """
+    Read and base64-encode a file once, as a MIME part that any number
+    of messages can share.  The file is read in chunks, so only the
+    encoded copy is ever held.
+    """
+    maintype, subtype = mimetype.split('/', 1)
+    part = MIMEBase(maintype, subtype)
+    encoded = []
+    size = 0
+    with content.open('rb') as f:
+        # 57-byte multiples encode to whole 76-character lines, unpadded
+        for chunk in iter(lambda: f.read(57 * 1024), b''):
+            size += len(chunk)
+            if size > settings.EMAIL_ATTACHMENT_MAX_BYTES:
+                raise ValueError(f'{filename} is too large to attach')
+            encoded.append(base64.encodebytes(chunk).decode('ascii'))
+    part.set_payload(''.join(encoded))
+    part['Content-Transfer-Encoding'] = 'base64'
+    part.add_header('Content-Disposition', 'attachment', filename=filename)
+    return part
+
 def build_email(template, subject, from_email, context=None, to=[], cc=[], bcc=[], attachments=[], html_content=None):
-    body = render_to_string(template, context)
+    body = get_email_template(template).render(context)
     if html_content:
-        html_rendered = render_to_string(html_content, context)
+        html_rendered = get_email_template(html_content).render(context)
     email = EmailMultiAlternatives(
         subject=subject,
         body=body,
@@ -145,17 +373,33 @@ def build_email(template, subject, from_email, context=None, to=[], cc=[], bcc=[
     if html_content:
         email.attach_alternative(html_rendered, "text/html")
     for attachment in attachments:
-        with attachment[1].open() as f:
-            email.attach(attachment[0], f.read(), attachment[2])
+        # Parts from load_attachment are shared as-is
+        if not isinstance(attachment, MIMEBase):
+            attachment = load_attachment(*attachment)
+        email.attach(attachment)
     return email
 
-@job
-def send_email(email):
+def send_message(email):
+    return email.send()
+
+@job('email')
+def send_email(template, subject, to, context=None, from_email='Help West Ada Admin <admin@helpwestada.com>'):
+    # Rendered in the worker; only the arguments are queued
+    email = build_email(
+        template=template,
+        subject=subject,
+        from_email=from_email,
+        context=context,
+        to=to,
+    )
     return email.send()
 
 
-@job
-def send_confirmation(user):
+@job('email')
+def send_confirmation(user_id):
+    user = User.objects.filter(pk=user_id).first()
+    if not user:
+        return
     email = build_email(
         template='app/emails/confirmation.txt',
         subject='Welcome to Help West Ada!',
@@ -166,7 +410,7 @@ def send_confirmation(user):
     return email.send()
 
 
-@job
+@job('email')
 def delete_user_email(email_address):
     email = build_email(
         template='app/emails/delete.txt',
@@ -177,44 +421,198 @@ def delete_user_email(email_address):
     return email.send()
 
 
+# Offers
+def get_offer_context(offer):
+    return {
+        'offer': offer,
+        'vacancy': offer.vacancy,
+        'url': settings.SITE_URL + reverse('offer', args=(offer.token,)),
+    }
+
+def build_offer_email(offer):
+    return build_email(
+        template='app/emails/offer.txt',
+        subject=f'Substitute needed at {offer.vacancy.school}',
+        from_email='Help West Ada Admin <admin@helpwestada.com>',
+        context=get_offer_context(offer),
+        to=[offer.account.email],
+    )
+
+def build_offer_sms(offer):
+    context = get_offer_context(offer)
+    date = offer.vacancy.date
+    return (
+        f"Help West Ada: substitute needed at {offer.vacancy.school} "
+        f"on {date:%b} {date.day}. Accept: {context['url']}"
+    )
+
+@job('interactive')
+def dispatch_offers(vacancy_id, limit=None):
+    vacancy = Vacancy.objects.select_related('school').get(pk=vacancy_id)
+    if vacancy.state != Vacancy.STATE.open:
+        return 0
+    candidates = get_candidates(vacancy, limit)
+    offers = list(create_offers(
+        vacancy,
+        [candidate['id'] for candidate in candidates],
+    ))
+    # Messages are rendered here; the pool threads only do network I/O
+    sends = []
+    targets = []
+    for offer in offers:
+        offer.vacancy = vacancy
+        sends.append(('email', send_message, build_offer_email(offer)))
+        targets.append(offer)
+        if offer.account.phone:
+            sends.append(('sms', send_sms, offer.account.phone, build_offer_sms(offer)))
+            targets.append(offer)
+    delivered = set()
+    for offer, ok in zip(targets, fan_out(sends)):
+        if ok:
+            delivered.add(offer.pk)
+    now = timezone.now()
+    for offer in offers:
+        if offer.pk in delivered:
+            offer.state = Offer.STATE.sent
+            offer.sent = now
+        else:
+            offer.state = Offer.STATE.failed
+        offer.updated = now
+    Offer.objects.bulk_update(offers, ['state', 'sent', 'updated'])
+    return len(delivered)
+
+
+# Broadcasts
+def iter_broadcast_batches(checkpoint, batch_size):
+    # Raw account numbers give a stable order to checkpoint against
+    rows = Account.objects.annotate(
+        number=Cast('id', output_field=IntegerField()),
+    ).filter(
+        number__gt=checkpoint,
+    ).exclude(
+        email='',
+    ).order_by(
+        'number',
+    ).values_list(
+        'number',
+        'name',
+        'email',
+    ).iterator(chunk_size=batch_size)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+@job('bulk')
+def send_broadcast(broadcast_id, batch_size=None):
+    batch_size = batch_size or settings.BROADCAST_BATCH_SIZE
+    broadcast = Broadcast.objects.get(pk=broadcast_id)
+    if broadcast.state == Broadcast.STATE.sent:
+        return broadcast.sent_count
+    Broadcast.objects.filter(pk=broadcast.pk).update(
+        state=Broadcast.STATE.sending,
+    )
+    attachments = []
+    if broadcast.attachment:
+        # Encoded once and shared by every message
+        attachments.append(load_attachment(
+            broadcast.attachment.name.rpartition('/')[2],
+            broadcast.attachment,
+            mimetypes.guess_type(broadcast.attachment.name)[0] or 'application/octet-stream',
+        ))
+    batches = iter_broadcast_batches(broadcast.checkpoint, batch_size)
+    for i, batch in enumerate(batches):
+        if i == settings.BROADCAST_BATCHES_PER_JOB:
+            # Carry on in a fresh job, well inside the queue's timeout
+            delay_unique(send_broadcast, str(broadcast.id))
+            return broadcast.sent_count
+        if i:
+            time.sleep(settings.BROADCAST_THROTTLE)
+        emails = [
+            build_email(
+                template=broadcast.template,
+                html_content=broadcast.html_template or None,
+                subject=broadcast.subject,
+                from_email='Help West Ada Admin <admin@helpwestada.com>',
+                context={'name': name, 'email': email},
+                to=[email],
+                attachments=attachments,
+            ) for number, name, email in batch
+        ]
+        # One connection for the whole batch instead of one per message
+        connection = get_connection()
+        try:
+            sent = connection.send_messages(emails) or 0
+        finally:
+            connection.close()
+        # A crash before this line re-sends at most this batch
+        broadcast.checkpoint = batch[-1][0]
+        broadcast.sent_count += sent
+        Broadcast.objects.filter(pk=broadcast.pk).update(
+            checkpoint=broadcast.checkpoint,
+            sent_count=broadcast.sent_count,
+            updated=timezone.now(),
+        )
+    Broadcast.objects.filter(pk=broadcast.pk).update(
+        state=Broadcast.STATE.sent,
+        updated=timezone.now(),
+    )
+    return broadcast.sent_count
+
+
+# Outbox
+def get_outbox_jobs():
+    return {
+        Outbox.OPERATION.delete_user: delete_user,
+        Outbox.OPERATION.delete_user_email: delete_user_email,
+    }
+
+@job('interactive')
+def relay_outbox(batch_size=None):
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    jobs = get_outbox_jobs()
+    total = 0
+    while True:
+        # Rows are removed in the same transaction that enqueues them, so
+        # a crash re-delivers rather than drops; skip_locked lets relays
+        # run side by side.
+        with transaction.atomic():
+            entries = list(
+                Outbox.objects.select_for_update(
+                    skip_locked=True,
+                ).order_by('created')[:batch_size]
+            )
+            if not entries:
+                break
+            routed = {}
+            for entry in entries:
+                func = jobs[entry.operation]
+                routed.setdefault(func.queue_name, []).append(
+                    Queue.prepare_data(func, kwargs=entry.payload),
+                )
+            for queue_name, data in routed.items():
+                get_queue(queue_name).enqueue_many(data)
+            Outbox.objects.filter(
+                id__in=[entry.id for entry in entries],
+            ).delete()
+        total += len(entries)
+    return total
+
+def enqueue_outbox_relay():
+    # However many rows a transaction wrote, one relay job waits
+    delay_unique(relay_outbox)
+    return
+
+def schedule_outbox_relay():
+    transaction.on_commit(enqueue_outbox_relay)
+    return
+
+
 def export_csv(filename='hwa.csv'):
     with open(filename, 'w') as f:
         writer = csv.writer(f)
-        cs = Account.objects.all()
-        r = [
-            'Status',
-            'Name',
-            'Address',
-            'Email',
-            'Phone',
-            'SSN',
-            'Has Diploma',
-            'Has Certificate',
-            'Criminal Conviction',
-            'Notes on Conviction',
-            'Sex Offender',
-            'WASD Experience',
-            'WASD Notes',
-            'School Preferences',
-            'Notes',
-        ]
-        writer.writerow(r)
-        for c in cs:
-            st = c.get_state_display()
-            writer.writerow([
-                st,
-                c.name,
-                c.address,
-                c.email,
-                c.phone,
-                c.ssn,
-                c.is_diploma,
-                c.is_certificate,
-                c.is_criminal,
-                c.criminal_notes,
-                c.is_offender,
-                c.is_wasd,
-                c.wasd_notes,
-                c.schools,
-                c.notes,
-            ])
+        writer.writerows(iter_account_rows(Account.objects.all()))
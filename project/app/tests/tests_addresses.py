@@ -0,0 +1,55 @@
+# Standard Libary
+from pathlib import Path
+
+# Third-Party
+import pytest
+from app.addresses import AddressIndex
+from app.addresses import clear_address_index
+from app.models import Geocode
+from django.core.management import call_command
+from django.urls import reverse
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def test_search():
+    index = AddressIndex([
+        '123 Main St, Meridian, ID 83642',
+        '125 Main St, Meridian, ID 83642',
+        '40 Maple Ave, Eagle, ID 83616',
+    ])
+    assert index.search('123 mai') == ['123 Main St, Meridian, ID 83642']
+    assert index.search('Main St') == [
+        '123 Main St, Meridian, ID 83642',
+        '125 Main St, Meridian, ID 83642',
+    ]
+    assert index.search('ma', limit=1) == []
+    assert index.search('map') == ['40 Maple Ave, Eagle, ID 83616']
+
+@pytest.fixture
+def addresses(tmp_path, settings):
+    settings.ADDRESS_INDEX_PATH = str(tmp_path / 'addresses.txt')
+    clear_address_index()
+    yield settings.ADDRESS_INDEX_PATH
+    clear_address_index()
+
+@pytest.mark.django_db
+def test_autocomplete(user_client, addresses):
+    Geocode.objects.create(
+        normalized='1 river st boise id 83702',
+        formatted='1 River St, Boise, ID 83702',
+        lat=43.6,
+        lon=-116.2,
+    )
+    call_command(
+        'build_addresses',
+        source=str(FIXTURES / 'addresses.csv'),
+        output=addresses,
+    )
+    path = reverse('address-autocomplete')
+    response = user_client.get(path, {'q': '123 Main'})
+    assert response.status_code == 200
+    assert response.json()['results'] == ['123 Main St, Meridian, ID 83642']
+    # Volunteers' geocoded addresses stay out of the index
+    response = user_client.get(path, {'q': 'river st'})
+    assert response.json()['results'] == []
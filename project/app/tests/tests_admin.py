@@ -1,7 +1,15 @@
-# Django
+# Standard Libary
+import csv
+import datetime
+
 # Third-Party
 import pytest
+from app.factories import UserFactory
+from app.models import Account
+from app.models import ExportCursor
+from app.models import Tombstone
 from django.urls import reverse
+from django.utils import timezone
 
 
 def test_deploy():
@@ -30,3 +38,74 @@ def test_account(admin_client, user):
     path = reverse('admin:app_account_change', args=(user.account.id,))
     response = admin_client.get(path)
     assert response.status_code == 200
+
+@pytest.mark.django_db
+def test_metrics(admin_client):
+    path = reverse('metrics')
+    response = admin_client.get(path)
+    assert response.status_code == 200
+
+@pytest.mark.django_db
+def test_export(admin_client, user):
+    path = reverse('export')
+    response = admin_client.get(path)
+    assert response.status_code == 200
+    content = b''.join(response.streaming_content).decode()
+    assert content.startswith('Status,Name')
+    assert user.account.name in content
+
+def get_delta(client, cursor):
+    response = client.get(reverse('export'), {'cursor': cursor})
+    assert response.status_code == 200
+    content = b''.join(response.streaming_content).decode()
+    header, *rows = csv.reader(content.splitlines())
+    assert header[:3] == ['ID', 'Action', 'Status']
+    return {(row[0], row[1]) for row in rows}
+
+@pytest.mark.django_db
+def test_export_delta(admin_client, settings):
+    one, two, three = [
+        UserFactory(username=name).account for name in ['one', 'two', 'three']
+    ]
+    Account.objects.update(
+        updated=timezone.now() - datetime.timedelta(minutes=10),
+    )
+    # Written inside the lag window, so held back from the first export
+    four = UserFactory(username='four').account
+    settings.EXPORT_DELTA_LAG = 60
+    assert get_delta(admin_client, 'crm') == {
+        (str(account.id), 'upsert') for account in Account.objects.exclude(
+            pk=four.pk,
+        )
+    }
+    cursor = ExportCursor.objects.get(name='crm')
+    assert cursor.watermark < timezone.now() - datetime.timedelta(seconds=59)
+    one.notes = 'Changed'
+    one.save()
+    two.user.delete()
+    settings.EXPORT_DELTA_LAG = 0
+    assert get_delta(admin_client, 'crm') == {
+        (str(one.id), 'upsert'),
+        (str(four.id), 'upsert'),
+        (str(two.id), 'delete'),
+    }
+    cursor.refresh_from_db()
+    assert cursor.watermark > timezone.now() - datetime.timedelta(seconds=5)
+    # The only cursor has seen the deletion
+    assert not Tombstone.objects.exists()
+    assert get_delta(admin_client, 'crm') == set()
+    # A new cursor starts from scratch
+    assert len(get_delta(admin_client, 'warehouse')) == Account.objects.count()
+
+@pytest.mark.django_db
+def test_school(admin_client, user, school):
+    path = reverse('admin:app_school_changelist')
+    response = admin_client.get(path)
+    assert response.status_code == 200
+    path = reverse('admin:app_school_change', args=(school.id,))
+    response = admin_client.get(path)
+    assert response.status_code == 200
+    account = user.account
+    account.schools = ['renaissance high school']
+    account.save()
+    assert list(Account.objects.preferring(school)) == [account]
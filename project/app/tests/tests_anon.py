@@ -1,6 +1,9 @@
 # Django
 # Third-Party
 import pytest
+from app.caching import PAGES_TAG
+from app.caching import invalidate_tags
+from app.factories import UserFactory
 from django.urls import reverse
 
 
@@ -28,3 +31,69 @@ def test_support(anon_client):
     path = reverse('support')
     response = anon_client.get(path)
     assert response.status_code == 200
+
+def test_conditional(anon_client):
+    path = reverse('about')
+    response = anon_client.get(path)
+    etag = response['ETag']
+    response = anon_client.get(path, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+@pytest.fixture
+def renders(monkeypatch):
+    # Start and finish with no cached pages
+    invalidate_tags(PAGES_TAG)
+    renders = []
+
+    def get_account_total():
+        renders.append(True)
+        return len(renders)
+
+    monkeypatch.setattr('app.views.get_account_total', get_account_total)
+    yield renders
+    invalidate_tags(PAGES_TAG)
+
+@pytest.mark.django_db
+def test_anonymous_cache(anon_client, renders):
+    path = reverse('index')
+    first = anon_client.get(path)
+    second = anon_client.get(path)
+    assert len(renders) == 1
+    assert second.status_code == 200
+    assert second.content == first.content
+
+@pytest.mark.django_db
+def test_anonymous_cache_query(anon_client, renders):
+    path = reverse('index')
+    anon_client.get(path, {'x': 1})
+    anon_client.get(path, {'x': 2})
+    assert len(renders) == 2
+    # Nor do they pick up the plain page
+    anon_client.get(path)
+    anon_client.get(path, {'x': 1})
+    assert len(renders) == 4
+
+@pytest.mark.django_db
+def test_anonymous_cache_authenticated(user_client, renders):
+    path = reverse('index')
+    user_client.get(path)
+    user_client.get(path)
+    assert len(renders) == 2
+
+@pytest.mark.django_db
+def test_anonymous_cache_invalidation(
+    anon_client,
+    renders,
+    django_capture_on_commit_callbacks,
+):
+    path = reverse('index')
+    anon_client.get(path)
+    with django_capture_on_commit_callbacks(execute=True):
+        account = UserFactory(username='new').account
+    anon_client.get(path)
+    anon_client.get(path)
+    assert len(renders) == 2
+    with django_capture_on_commit_callbacks(execute=True):
+        account.delete()
+    anon_client.get(path)
+    assert len(renders) == 3
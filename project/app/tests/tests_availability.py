@@ -0,0 +1,76 @@
+# Standard Libary
+import datetime
+
+# Third-Party
+import pytest
+from app.availability import filter_available
+from app.availability import filter_unknown
+from app.availability import free_on_all
+from app.availability import get_day_index
+from app.availability import get_masks
+from app.availability import get_weekdays
+from app.availability import set_availability
+from app.models import Account
+from django.urls import reverse
+
+MONDAY = datetime.date(2021, 3, 1)
+WEEK = [MONDAY + datetime.timedelta(days=i) for i in range(3)]
+
+
+def test_day_index():
+    # 2020-08-01 was a Saturday, so Monday the 3rd is the first bit
+    assert get_day_index(datetime.date(2020, 8, 3)) == (2020, 0)
+    assert get_day_index(datetime.date(2020, 8, 10)) == (2020, 5)
+    assert get_day_index(datetime.date(2020, 8, 8)) is None
+    assert get_day_index(datetime.date(2021, 8, 3)) == (2021, 1)
+
+@pytest.mark.django_db
+def test_available(user):
+    accounts = Account.objects.filter(pk=user.account.pk)
+    assert set_availability(accounts, WEEK) == 1
+    assert filter_available(Account.objects.all(), WEEK).count() == 1
+    set_availability(accounts, WEEK[1:2], available=False)
+    assert filter_available(Account.objects.all(), WEEK).count() == 0
+    assert filter_available(Account.objects.all(), WEEK[::2]).count() == 1
+    masks = get_masks(Account.objects.all(), 2020)
+    assert free_on_all(masks, WEEK[::2]) == [user.account.pk.id]
+    assert free_on_all(masks, WEEK) == []
+
+@pytest.mark.django_db
+def test_unknown(user):
+    accounts = Account.objects.filter(pk=user.account.pk)
+    assert filter_unknown(Account.objects.all(), WEEK).count() == 1
+    # Last year's answers don't count
+    set_availability(accounts, [MONDAY - datetime.timedelta(days=364)])
+    assert filter_unknown(Account.objects.all(), WEEK).count() == 1
+    set_availability(accounts, WEEK[:1], available=False)
+    assert filter_unknown(Account.objects.all(), WEEK).count() == 0
+    assert filter_available(Account.objects.all(), WEEK).count() == 0
+
+@pytest.mark.django_db
+def test_account_weekdays(user_client, monkeypatch):
+    monkeypatch.setattr('django.utils.timezone.localdate', lambda: MONDAY)
+    path = reverse('account')
+    data = {
+        'name': 'User',
+        'email': 'user@localhost',
+        'phone': '2085551234',
+        'address': '123 Main St, Meridian, ID 83642',
+        'schools': '',
+    }
+    # Unanswered stays unknown
+    response = user_client.post(path, data)
+    assert response.status_code == 302
+    account = Account.objects.get()
+    assert account.availability is None
+    response = user_client.post(path, {**data, 'weekdays': ['0', '2']})
+    assert response.status_code == 302
+    account.refresh_from_db()
+    assert get_weekdays(account, MONDAY) == [0, 2]
+    assert filter_available(Account.objects.all(), WEEK[::2]).count() == 1
+    assert filter_available(Account.objects.all(), WEEK[1:2]).count() == 0
+    # Through to the end of the school year
+    june = datetime.date(2021, 6, 2)
+    assert filter_available(Account.objects.all(), [june]).count() == 1
+    response = user_client.get(path)
+    assert response.context['form']['weekdays'].value() == [0, 2]
@@ -0,0 +1,71 @@
+# Standard Libary
+from email import message_from_bytes
+
+# Third-Party
+import pytest
+from app.factories import UserFactory
+from app.models import Broadcast
+from app.tasks import build_email
+from app.tasks import load_attachment
+from app.tasks import send_broadcast
+from django.core import mail
+from django.core.files.base import ContentFile
+from django_rq import get_queue
+
+
+@pytest.mark.django_db
+def test_send_broadcast(settings):
+    settings.BROADCAST_THROTTLE = 0
+    accounts = [UserFactory(username=f'user{i}').account for i in range(5)]
+    broadcast = Broadcast.objects.create(subject='Closing')
+    # Resumes after the checkpoint rather than starting over
+    broadcast.checkpoint = accounts[0].id.id
+    broadcast.save()
+    assert send_broadcast(broadcast.id, batch_size=2) == 4
+    assert len(mail.outbox) == 4
+    broadcast.refresh_from_db()
+    assert broadcast.state == Broadcast.STATE.sent
+    assert broadcast.checkpoint == accounts[-1].id.id
+    assert send_broadcast(broadcast.id) == 4
+    assert len(mail.outbox) == 4
+
+@pytest.mark.django_db
+def test_send_broadcast_continues(settings):
+    settings.BROADCAST_THROTTLE = 0
+    settings.BROADCAST_BATCH_SIZE = 2
+    settings.BROADCAST_BATCHES_PER_JOB = 1
+    queue = get_queue('bulk')
+    queue.empty()
+    for i in range(3):
+        UserFactory(username=f'user{i}')
+    broadcast = Broadcast.objects.create(subject='Closing')
+    assert send_broadcast(str(broadcast.id)) == 2
+    broadcast.refresh_from_db()
+    assert broadcast.state == Broadcast.STATE.sending
+    # The rest is left to a follow-up job
+    job = queue.jobs[0]
+    assert job.func is send_broadcast
+    assert job.timeout == 60 * 30
+    assert send_broadcast(*job.args) == 3
+    broadcast.refresh_from_db()
+    assert broadcast.state == Broadcast.STATE.sent
+    assert len(mail.outbox) == 3
+    queue.empty()
+
+def test_shared_attachment():
+    content = ContentFile(bytes(range(256)) * 1000, name='packet.pdf')
+    part = load_attachment('packet.pdf', content, 'application/pdf')
+    emails = [
+        build_email(
+            template='app/emails/closing.txt',
+            subject='Closing',
+            from_email='admin@localhost',
+            to=[f'user{i}@localhost'],
+            attachments=[part],
+        ) for i in range(2)
+    ]
+    for email in emails:
+        message = message_from_bytes(email.message().as_bytes())
+        attachment = message.get_payload()[1]
+        assert attachment.get_filename() == 'packet.pdf'
+        assert attachment.get_payload(decode=True) == bytes(range(256)) * 1000
@@ -0,0 +1,100 @@
+# Standard Libary
+import datetime
+
+# Third-Party
+import pytest
+from app.availability import set_availability
+from app.dispatch import get_candidates
+from app.factories import SchoolFactory
+from app.factories import UserFactory
+from app.models import Account
+from app.models import School
+from app.models import Vacancy
+from django.core.management import call_command
+from django.urls import reverse
+
+
+def make_account(username, lat, lon, schools=[], is_diploma=True):
+    account = UserFactory(username=username).account
+    account.address = f'{username} St'
+    account.is_diploma = is_diploma
+    account.schools = schools
+    account.save()
+    # Skip geocoding; place the volunteer directly
+    Account.objects.filter(pk=account.pk).update(lat=lat, lon=lon)
+    return account
+
+@pytest.mark.django_db
+def test_candidates(admin_client, vacancy):
+    SchoolFactory(name='Nowhere Elementary School')
+    near = make_account('near', 43.6130, -116.3920)
+    far = make_account('far', 43.7000, -116.3000)
+    preferring = make_account('preferring', 43.7500, -116.5000, schools=['Renaissance High'])
+    other = make_account('other', 43.6125, -116.3910, schools=['Nowhere Elementary'])
+    make_account('ineligible', 43.6121, -116.3915, is_diploma=False)
+    busy = make_account('busy', 43.6121, -116.3915)
+    set_availability(Account.objects.all(), [vacancy.date])
+    set_availability(
+        Account.objects.filter(pk=busy.pk),
+        [vacancy.date],
+        available=False,
+    )
+    # Never said; nearest of all, but after those confirmed free
+    unknown = make_account('unknown', 43.6121, -116.3915)
+    candidates = get_candidates(vacancy)
+    assert [c['id'] for c in candidates] == [
+        preferring.id, near.id, far.id, unknown.id, other.id,
+    ]
+    assert [c['is_confirmed'] for c in candidates] == [
+        True, True, True, False, True,
+    ]
+    path = reverse('vacancy-candidates', args=(vacancy.id,))
+    response = admin_client.get(path)
+    assert response.status_code == 200
+    assert len(response.json()['candidates']) == 5
+
+@pytest.mark.django_db
+def test_candidates_booked(vacancy):
+    booked = make_account('booked', 43.6130, -116.3920)
+    # Filled another day and cancelled this day; still free this day
+    free = make_account('free', 43.6131, -116.3921)
+    set_availability(Account.objects.all(), [vacancy.date])
+    for account, date, state in [
+        (booked, vacancy.date, Vacancy.STATE.filled),
+        (free, vacancy.date + datetime.timedelta(days=1), Vacancy.STATE.filled),
+        (free, vacancy.date, Vacancy.STATE.cancelled),
+    ]:
+        Vacancy.objects.create(
+            school=vacancy.school,
+            date=date,
+            band=Vacancy.BAND.high,
+            state=state,
+            account=account,
+        )
+    candidates = get_candidates(vacancy)
+    assert [c['id'] for c in candidates] == [free.id]
+
+
+class StubGeocoder:
+    def geocode(self, address):
+        return {
+            'formatted': address,
+            'components': {},
+            'lat': 43.6121,
+            'lon': -116.3915,
+        }
+
+
+@pytest.mark.django_db
+def test_candidates_unlocated(admin_client, vacancy, settings):
+    school = vacancy.school
+    School.objects.filter(pk=school.pk).update(lat=None, lon=None)
+    vacancy.refresh_from_db()
+    with pytest.raises(ValueError):
+        get_candidates(vacancy)
+    path = reverse('vacancy-candidates', args=(vacancy.id,))
+    assert admin_client.get(path).status_code == 409
+    settings.GEOCODER = 'app.tests.tests_dispatch.StubGeocoder'
+    call_command('geocode_schools')
+    school.refresh_from_db()
+    assert school.lat == 43.6121
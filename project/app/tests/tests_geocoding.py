@@ -0,0 +1,72 @@
+# Django
+# Third-Party
+import pytest
+from app.geocoding import GeocodeError
+from app.geocoding import encode_geohash
+from app.geocoding import geocode
+from app.geocoding import parse_address
+from app.models import Geocode
+
+
+def test_geohash():
+    assert encode_geohash(57.64911, 10.40744) == 'u4pruydqq'
+
+def test_parse_address():
+    value = "{'formatted': '1 Main St, Meridian, ID', 'locality': 'Meridian', 'latitude': '43.6', 'longitude': '-116.4'}"
+    assert parse_address(value) == (
+        '1 Main St, Meridian, ID',
+        {'locality': 'Meridian'},
+        43.6,
+        -116.4,
+    )
+    assert parse_address('1 Main St') == ('1 Main St', {}, None, None)
+
+@pytest.mark.django_db
+def test_geocode_cache():
+    first = geocode('1 Main St, Meridian, ID')
+    second = geocode('1 main st meridian id')
+    assert first == second
+    assert Geocode.objects.count() == 1
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        return
+
+    def json(self):
+        return self.data
+
+
+class StubSession:
+    def __init__(self, *data):
+        self.data = list(data)
+
+    def get(self, url, params):
+        return Response(self.data.pop(0))
+
+
+@pytest.mark.django_db
+def test_geocode_status(settings, monkeypatch):
+    settings.GEOCODER = 'app.geocoding.GoogleGeocoder'
+    session = StubSession(
+        {'status': 'OVER_QUERY_LIMIT', 'results': []},
+        {'status': 'OK', 'results': [{
+            'formatted_address': '1 Main St, Meridian, ID 83642, USA',
+            'address_components': [],
+            'geometry': {'location': {'lat': 43.6, 'lng': -116.4}},
+        }]},
+        {'status': 'ZERO_RESULTS', 'results': []},
+    )
+    monkeypatch.setattr('app.geocoding.get_session', lambda: session)
+    # Over quota: raised for a retry, and nothing cached
+    with pytest.raises(GeocodeError):
+        geocode('1 Main St, Meridian, ID')
+    assert not Geocode.objects.exists()
+    assert geocode('1 Main St, Meridian, ID').lat == 43.6
+    # A real miss is cached
+    assert geocode('Nowhere').lat is None
+    assert geocode('Nowhere').lat is None
+    assert Geocode.objects.count() == 2
@@ -0,0 +1,66 @@
+# Standard Libary
+import json
+
+# Third-Party
+import pytest
+from app.factories import UserFactory
+from app.matching import Points
+from app.matching import rank_accounts
+from app.models import Account
+from django.urls import reverse
+
+
+def test_nearest():
+    points = Points([
+        ('boise', 43.6150, -116.2023),
+        ('meridian', 43.6121, -116.3915),
+        ('eagle', 43.6955, -116.3540),
+        ('nowhere', None, None),
+    ])
+    assert len(points) == 3
+    nearest = points.nearest(43.6121, -116.3915, limit=2)
+    assert [pk for distance, pk in nearest] == ['meridian', 'eagle']
+    assert nearest[0][0] == pytest.approx(0, abs=1e-6)
+    # Meridian to Boise is about 15 km
+    distances = dict(zip(points.ids, points.distances(43.6121, -116.3915)))
+    assert distances['boise'] == pytest.approx(15.2, abs=0.5)
+
+@pytest.mark.django_db
+def test_school_matches(admin_client, user, school):
+    school.lat = 43.6121
+    school.lon = -116.3915
+    school.save()
+    account = user.account
+    account.address = json.dumps({
+        'formatted': '1 Main St, Meridian, ID',
+        'latitude': 43.6150,
+        'longitude': -116.2023,
+    })
+    account.save()
+    path = reverse('school-matches', args=(school.id,))
+    response = admin_client.get(path)
+    assert response.status_code == 200
+    assert response.json()['accounts'][0]['id'] == str(account.id)
+    path = reverse('account-matches', args=(account.id,))
+    response = admin_client.get(path)
+    assert response.json()['schools'][0]['name'] == school.name
+
+@pytest.mark.django_db
+def test_rank_accounts(school):
+    school.lat = 43.6121
+    school.lon = -116.3915
+    for i, (lat, lon) in enumerate([
+        (43.6130, -116.3920),
+        (43.6500, -116.4000),
+        (43.7000, -116.3000),
+        # Boise, Twin Falls: outside the first box
+        (43.6150, -116.2023),
+        (42.5630, -114.4609),
+    ]):
+        account = UserFactory(username=f'rank{i}').account
+        Account.objects.filter(pk=account.pk).update(lat=lat, lon=lon)
+    ranked = rank_accounts(school, limit=4)
+    expected = Points(
+        Account.objects.values_list('id', 'lat', 'lon'),
+    ).nearest(school.lat, school.lon, 4)
+    assert ranked == expected
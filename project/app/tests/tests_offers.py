@@ -0,0 +1,67 @@
+# Django
+# Third-Party
+import pytest
+from app import sms
+from app.availability import set_availability
+from app.models import Account
+from app.models import Offer
+from app.models import Vacancy
+from app.offers import claim_offer
+from app.tasks import dispatch_offers
+from django.core import mail
+from django.urls import reverse
+
+
+@pytest.fixture
+def offers(vacancy, user, admin_client):
+    for account in Account.objects.all():
+        account.address = 'Meridian'
+        account.is_diploma = True
+        account.phone = '2085551234'
+        account.save()
+    Account.objects.update(lat=vacancy.school.lat, lon=vacancy.school.lon)
+    set_availability(Account.objects.all(), [vacancy.date])
+    sms.outbox.clear()
+    assert dispatch_offers(vacancy.id) == 2
+    return list(Offer.objects.filter(vacancy=vacancy))
+
+@pytest.mark.django_db
+def test_dispatch_offers(offers):
+    assert len(mail.outbox) == 2
+    assert len(sms.outbox) == 2
+    assert all(offer.state == Offer.STATE.sent for offer in offers)
+
+@pytest.mark.django_db
+def test_claim_offer(offers, vacancy, anon_client):
+    first, second = offers
+    path = reverse('offer', args=(first.token,))
+    response = anon_client.post(path)
+    assert response.status_code == 302
+    response = anon_client.get(path)
+    assert b'This position is yours' in response.content
+    assert claim_offer(second) is False
+    vacancy.refresh_from_db()
+    assert vacancy.state == Vacancy.STATE.filled
+    assert vacancy.account_id == first.account_id
+    second.refresh_from_db()
+    assert second.state == Offer.STATE.expired
+
+@pytest.mark.django_db
+def test_claim_offer_same_day(offers, vacancy):
+    first = offers[0]
+    other = Vacancy.objects.create(
+        school=vacancy.school,
+        date=vacancy.date,
+        band=Vacancy.BAND.high,
+    )
+    double = Offer.objects.create(
+        vacancy=other,
+        account_id=first.account_id,
+        token='double',
+        state=Offer.STATE.sent,
+    )
+    assert claim_offer(first) is True
+    # Already booked that day
+    assert claim_offer(double) is False
+    other.refresh_from_db()
+    assert other.state == Vacancy.STATE.open
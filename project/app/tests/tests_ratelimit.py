@@ -0,0 +1,34 @@
+# Standard Libary
+import time
+
+# Third-Party
+import pytest
+from app.ratelimit import TokenBucket
+from django_redis import get_redis_connection
+
+
+class Response:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def bucket():
+    bucket = TokenBucket('test', rate=1, capacity=2)
+    yield bucket
+    get_redis_connection('default').delete(bucket.key)
+
+def test_token_bucket(bucket):
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # Waiters queue up a token apart
+    assert 0.9 < bucket.reserve() <= 1
+    assert 1.9 < bucket.reserve() <= 2
+
+def test_token_bucket_headers(bucket):
+    bucket.observe(Response(headers={
+        'X-RateLimit-Remaining': '0',
+        'X-RateLimit-Reset': str(int(time.time()) + 5),
+    }))
+    assert 4 < bucket.reserve() <= 6
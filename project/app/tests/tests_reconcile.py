@@ -0,0 +1,112 @@
+# Standard Libary
+import gzip
+import json
+
+# Third-Party
+import pytest
+from app import reconcile
+from app.factories import UserFactory
+from app.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+
+class StubResponse:
+    def __init__(self, data=None, content=b''):
+        self.data = data
+        self.content = content
+
+    def raise_for_status(self):
+        return
+
+    def json(self):
+        return self.data
+
+
+class StubTenant:
+    """
+    The management API endpoints reconcile uses, served from memory:
+    the sorted, paged users list and a user export.
+    """
+
+    def __init__(self, users):
+        self.users = sorted(users, key=lambda user: user['user_id'])
+        self.total = len(self.users)
+        self.requests = 0
+
+    def request(self, method, endpoint, params=None, **kwargs):
+        self.requests += 1
+        if endpoint == 'jobs/users-exports':
+            return StubResponse({'id': 'job_1', 'status': 'pending'})
+        if endpoint.startswith('jobs/'):
+            return StubResponse({
+                'id': 'job_1',
+                'status': 'completed',
+                'location': 'https://exports.localhost/job_1.json.gz',
+            })
+        if params.get('include_totals'):
+            return StubResponse({'total': self.total, 'users': []})
+        start = params['page'] * params['per_page']
+        return StubResponse(self.users[start:start + params['per_page']])
+
+    def get(self, url, **kwargs):
+        # Exports come unordered
+        lines = [json.dumps(user) for user in reversed(self.users)]
+        return StubResponse(content=gzip.compress('\n'.join(lines).encode()))
+
+
+@pytest.fixture
+def tenant(monkeypatch):
+    tenant = StubTenant([{
+        'user_id': f'auth0|{i:03}',
+        'name': f'User {i}',
+        'email': f'user{i}@localhost',
+        'email_verified': True,
+    } for i in range(5)])
+    monkeypatch.setattr(reconcile, 'auth0_request', tenant.request)
+    monkeypatch.setattr(reconcile, 'get_session', lambda: tenant)
+    return tenant
+
+@pytest.fixture
+def users():
+    for i in (0, 1, 2):
+        UserFactory(
+            username=f'auth0|{i:03}',
+            name=f'User {i}',
+            email=f'user{i}@localhost',
+            is_verified=True,
+        )
+    User.objects.filter(username='auth0|001').update(name='Stale')
+    UserFactory(username='auth0|zzz')
+    # Local-only accounts (no provider) are not Auth0's
+    UserFactory(username='admin')
+    return
+
+def assert_reconciled(out):
+    assert "~ auth0|001 name: 'Stale' -> 'User 1'" in out
+    assert "- auth0|003 missing locally" in out
+    assert "+ auth0|zzz missing remotely" in out
+    assert "2 missing locally, 1 missing remotely, 1 drifted, 1 fixed." in out
+    assert User.objects.get(username='auth0|001').name == 'User 1'
+
+@pytest.mark.django_db
+def test_reconcile_auth0(tenant, users, capsys):
+    call_command('reconcile_auth0', '--apply', '--page-size=2')
+    assert_reconciled(capsys.readouterr().out)
+    # The total, then three pages
+    assert tenant.requests == 4
+
+@pytest.mark.django_db
+def test_reconcile_auth0_export(tenant, users, capsys, monkeypatch, settings):
+    monkeypatch.setattr(reconcile, 'AUTH0_SEARCH_LIMIT', 3)
+    settings.AUTH0_EXPORT_POLL_INTERVAL = 0
+    call_command('reconcile_auth0', '--apply')
+    assert_reconciled(capsys.readouterr().out)
+
+@pytest.mark.django_db
+def test_reconcile_auth0_cap(tenant, users, monkeypatch):
+    # Users added after the total was read push paging past the cap
+    monkeypatch.setattr(reconcile, 'AUTH0_SEARCH_LIMIT', 3)
+    tenant.total = 3
+    with pytest.raises(CommandError):
+        call_command('reconcile_auth0', '--page-size=1')
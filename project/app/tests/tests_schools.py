@@ -0,0 +1,54 @@
+# Django
+# Third-Party
+import pytest
+from app.factories import UserFactory
+from app.models import Account
+from app.schools import SchoolIndex
+from django.core.management import call_command
+
+SCHOOLS = [
+    (1, 'River Valley Elementary School'),
+    (2, 'Renaissance High School'),
+    (3, 'Pepper Ridge Elementary'),
+    (4, 'Lake Hazel Elementary School'),
+    (5, 'Lake Hazel Middle School'),
+    (6, 'Mountain View High School'),
+]
+
+
+@pytest.fixture
+def index():
+    return SchoolIndex(SCHOOLS)
+
+@pytest.mark.parametrize('text,school_id', [
+    ('Renaissance High School', 2),
+    ('renaissance high', 2),
+    ('RVES', 1),
+    ('Pepper Ridge Elementary School', 3),
+    ('Lake Hazel MS', 5),
+    ('Mountian View Hgh', 6),
+    ('Lake Hazel', None),
+    ('Boise High', None),
+    ('', None),
+])
+def test_resolve(index, text, school_id):
+    assert index.resolve(text) == school_id
+
+@pytest.mark.django_db
+def test_resolve_schools(school, settings, capsys):
+    settings.EXPORT_CHUNK_SIZE = 2
+    for name in ['one', 'two', 'three']:
+        account = UserFactory(username=name).account
+        account.schools = ['renaissance high']
+        account.save()
+    UserFactory(username='none')
+    # As for rows saved before the column existed
+    Account.objects.update(school_ids=[])
+    call_command('resolve_schools')
+    assert capsys.readouterr().out.strip() == (
+        "Resolved schools for 3 accounts."
+    )
+    assert Account.objects.filter(school_ids=[school.id.id]).count() == 3
+    # Nothing left to change
+    call_command('resolve_schools')
+    assert "for 0 accounts" in capsys.readouterr().out
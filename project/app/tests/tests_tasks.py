@@ -0,0 +1,275 @@
+# Standard Libary
+import threading
+import time
+
+# Third-Party
+import pytest
+from app.factories import UserFactory
+from app.models import Outbox
+from app.ratelimit import get_auth0_limiter
+from app.tasks import ACCOUNT_TOTAL_FRESH_KEY
+from app.tasks import ACCOUNT_TOTAL_KEY
+from app.tasks import AUTH0_TOKEN_KEY
+from app.tasks import adjust_account_total
+from app.tasks import auth0_request
+from app.tasks import create_auth0_user
+from app.tasks import delay_unique
+from app.tasks import delete_user
+from app.tasks import geocode_account
+from app.tasks import get_account_total
+from app.tasks import get_auth0_token
+from app.tasks import get_auth0_token_stats
+from app.tasks import reconcile_account_total
+from app.tasks import relay_outbox
+from app.workers import PersistentWorker
+from app.workers import get_restart_delay
+from app.workers import ping
+from django.core.cache import cache
+from django.db import transaction
+from django_redis import get_redis_connection
+from django_rq import get_queue
+from rq import Queue
+
+
+@pytest.fixture
+def queue():
+    queue = get_queue('interactive')
+    queue.empty()
+    yield queue
+    queue.empty()
+
+@pytest.fixture
+def outbox_queues():
+    queues = {name: get_queue(name) for name in ['auth0', 'email']}
+    for queue in queues.values():
+        queue.empty()
+    yield queues
+    for queue in queues.values():
+        queue.empty()
+
+
+class Response:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.headers = {}
+        self.data = data
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise AssertionError(self.status_code)
+
+
+class StubSession:
+    """
+    Stands in for the Auth0 session: hands out numbered tokens and
+    answers API calls with the queued status codes.
+    """
+    def __init__(self):
+        self.tokens = 0
+        self.statuses = []
+        self.requests = []
+        self.delay = 0
+
+    def post(self, url, json):
+        time.sleep(self.delay)
+        self.tokens += 1
+        return Response(data={
+            'access_token': f'token-{self.tokens}',
+            'expires_in': 86400,
+        })
+
+    def request(self, method, url, headers):
+        self.requests.append(headers['Authorization'])
+        return Response(self.statuses.pop(0) if self.statuses else 200)
+
+
+@pytest.fixture
+def session(monkeypatch, settings):
+    settings.AUTH0_RATE_LIMIT = 100
+    session = StubSession()
+    monkeypatch.setattr('app.tasks.get_session', lambda: session)
+    keys = [
+        AUTH0_TOKEN_KEY,
+        f'{AUTH0_TOKEN_KEY}:hits',
+        f'{AUTH0_TOKEN_KEY}:misses',
+    ]
+    cache.delete_many(keys)
+    yield session
+    cache.delete_many(keys)
+    get_redis_connection('default').delete(get_auth0_limiter().key)
+
+def test_delay_unique(queue):
+    job = delay_unique(geocode_account, 'abc')
+    assert job.id == 'geocode_account:abc'
+    assert delay_unique(geocode_account, 'abc').id == job.id
+    assert queue.count == 1
+
+def test_delay_unique_concurrent(queue, monkeypatch):
+    fetch_job = Queue.fetch_job
+
+    def slow_fetch_job(self, job_id):
+        # Widen the gap between the check and the enqueue
+        job = fetch_job(self, job_id)
+        time.sleep(0.2)
+        return job
+
+    monkeypatch.setattr(Queue, 'fetch_job', slow_fetch_job)
+    threads = [
+        threading.Thread(target=delay_unique, args=(geocode_account, 'abc'))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert queue.job_ids == ['geocode_account:abc']
+
+# Connections are checked between jobs, so no wrapping transaction
+@pytest.mark.django_db(transaction=True)
+def test_persistent_worker(queue):
+    job = queue.enqueue(ping)
+    worker = PersistentWorker([queue], connection=queue.connection)
+    worker.work(burst=True, max_jobs=1)
+    assert job.get_status() == 'finished'
+    assert job.result is False
+
+def test_restart_delay(settings):
+    settings.RQ_MIN_UPTIME = 30
+    settings.RQ_RESTART_BACKOFF = 1
+    settings.RQ_RESTART_BACKOFF_MAX = 8
+    delays = [0]
+    for _ in range(5):
+        delays.append(get_restart_delay(2, delays[-1]))
+    assert delays == [0, 1, 2, 4, 8, 8]
+    # A worker that ran a while is replaced at once
+    assert get_restart_delay(60, 8) == 0
+
+@pytest.mark.django_db
+def test_delete_outbox(user, queue):
+    user.delete()
+    assert sorted(Outbox.objects.values_list('operation', 'payload')) == [
+        (Outbox.OPERATION.delete_user, {'user_id': 'user'}),
+        (Outbox.OPERATION.delete_user_email, {'email_address': 'user@localhost'}),
+    ]
+    # Nothing leaves until the delete commits
+    assert queue.count == 0
+
+@pytest.mark.django_db
+def test_relay_outbox(user, outbox_queues):
+    user.delete()
+    assert relay_outbox() == 2
+    assert not Outbox.objects.exists()
+    # A second relay finds nothing to re-deliver
+    assert relay_outbox() == 0
+    assert outbox_queues['auth0'].count == 1
+    assert outbox_queues['email'].count == 1
+    job = outbox_queues['auth0'].jobs[0]
+    assert job.func is delete_user
+    assert job.kwargs == {'user_id': 'user'}
+
+@pytest.mark.django_db
+def test_relay_outbox_retry(user, outbox_queues, monkeypatch):
+    user.delete()
+    def enqueue_many(self, data, pipeline=None):
+        raise ConnectionError
+    with monkeypatch.context() as patch:
+        patch.setattr(Queue, 'enqueue_many', enqueue_many)
+        with pytest.raises(ConnectionError):
+            relay_outbox()
+    # The rows roll back with the failed enqueue and go out next time
+    assert Outbox.objects.count() == 2
+    assert relay_outbox() == 2
+    assert outbox_queues['auth0'].count == 1
+
+def test_delete_user_repeat(monkeypatch):
+    monkeypatch.setattr(
+        'app.tasks.auth0_request',
+        lambda method, endpoint: Response(404),
+    )
+    assert delete_user('user') == 404
+
+@pytest.mark.django_db(transaction=True)
+def test_schedule_outbox_relay(queue):
+    with transaction.atomic():
+        UserFactory(username='one').delete()
+        UserFactory(username='two').delete()
+    assert queue.job_ids == ['relay_outbox']
+
+def test_auth0_token_cache(session):
+    assert get_auth0_token()['access_token'] == 'token-1'
+    assert get_auth0_token()['access_token'] == 'token-1'
+    assert session.tokens == 1
+    assert get_auth0_token_stats() == {'hits': 1, 'misses': 1}
+
+def test_auth0_token_lock(session):
+    # A burst of cold workers makes a single exchange
+    session.delay = 0.2
+    threads = [threading.Thread(target=get_auth0_token) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert session.tokens == 1
+    assert get_auth0_token_stats() == {'hits': 7, 'misses': 1}
+
+def test_auth0_request_unauthorized(session):
+    session.statuses = [401]
+    assert auth0_request('GET', 'users/user').status_code == 401
+    assert cache.get(AUTH0_TOKEN_KEY) is None
+    assert auth0_request('GET', 'users/user').status_code == 200
+    assert session.requests == ['Bearer token-1', 'Bearer token-2']
+
+def test_auth0_request_throttled(session, settings):
+    session.statuses = [429, 429, 200]
+    assert auth0_request('GET', 'users/user').status_code == 200
+    assert len(session.requests) == 3
+    # Gives up after the configured retries
+    session.statuses = [429] * 10
+    assert auth0_request('GET', 'users/user').status_code == 429
+    assert len(session.requests) == 3 + settings.AUTH0_RATE_RETRIES + 1
+
+@pytest.mark.django_db
+def test_account_total(user, django_assert_num_queries):
+    queue = get_queue('bulk')
+    queue.empty()
+    cache.delete_many([ACCOUNT_TOTAL_KEY, ACCOUNT_TOTAL_FRESH_KEY])
+    # Pages never count; the recount is queued instead
+    with django_assert_num_queries(0):
+        assert get_account_total() is None
+        assert get_account_total() is None
+    assert queue.job_ids == ['reconcile_account_total']
+    assert reconcile_account_total() == 1
+    adjust_account_total(1)
+    with django_assert_num_queries(0):
+        assert get_account_total() == 2
+    assert queue.count == 1
+    # Once the marker lapses, the next read queues a recount
+    queue.empty()
+    cache.delete(ACCOUNT_TOTAL_FRESH_KEY)
+    assert get_account_total() == 2
+    assert get_account_total() == 2
+    assert queue.job_ids == ['reconcile_account_total']
+    queue.empty()
+    cache.delete_many([ACCOUNT_TOTAL_KEY, ACCOUNT_TOTAL_FRESH_KEY])
+
+@pytest.mark.django_db
+def test_create_auth0_user(monkeypatch):
+    responses = [
+        Response(201, {'user_id': 'auth0|created'}),
+        Response(409),
+        Response(429),
+    ]
+    monkeypatch.setattr(
+        'app.tasks.auth0_request',
+        lambda method, endpoint, json: responses.pop(0),
+    )
+    user = create_auth0_user('Created', 'created@localhost')
+    assert user.username == 'auth0|created'
+    assert user.name == 'Created'
+    assert create_auth0_user('Created', 'created@localhost') is None
+    # Anything else fails the job
+    with pytest.raises(AssertionError):
+        create_auth0_user('Created', 'created@localhost')
@@ -0,0 +1,177 @@
+# Standard Libary
+import re
+import threading
+import time
+
+# Third-Party
+import pytest
+from app.backends import Auth0Backend
+from app.factories import UserFactory
+from app.models import Account
+from app.models import User
+from app.tasks import update_user
+from django.db import connection
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.test.client import Client
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+
+@pytest.mark.django_db
+def test_account_etag_after_login(user):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    path = reverse('account')
+    response = client.get(path)
+    etag = response['ETag']
+    # A second login rotates the CSRF secret
+    client.logout()
+    client.force_login(user)
+    client.cookies['csrftoken'] = get_random_string(32)
+    response = client.get(path, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    token = re.search(
+        r'name="csrfmiddlewaretoken" value="([^"]+)"',
+        response.content.decode(),
+    ).group(1)
+    response = client.post(path, {
+        'csrfmiddlewaretoken': token,
+        'name': 'User',
+        'email': 'user@localhost',
+        'phone': '2085551234',
+        'address': '1 Main St, Meridian, ID',
+        'schools': '',
+    })
+    assert response.status_code == 302
+
+def get_claims(**kwargs):
+    claims = {
+        'username': 'auth0|upsert',
+        'name': 'Upsert',
+        'email': 'upsert@localhost',
+        'is_verified': True,
+        'data': {'sub': 'auth0|upsert'},
+    }
+    claims.update(kwargs)
+    return claims
+
+@pytest.mark.django_db
+def test_upsert():
+    user, created, changed = User.objects.upsert(**get_claims())
+    assert created
+    assert user.name == 'Upsert'
+    user, created, changed = User.objects.upsert(**get_claims(name='Renamed'))
+    assert not created
+    assert changed == {'name'}
+    assert User.objects.get(username='auth0|upsert').name == 'Renamed'
+    user, created, changed = User.objects.upsert(**get_claims(name='Renamed'))
+    assert not created
+    assert changed == set()
+    assert user.name == 'Renamed'
+
+@pytest.mark.django_db(transaction=True)
+def test_upsert_race():
+    inserted = threading.Event()
+
+    def login():
+        with transaction.atomic():
+            User.objects.upsert(**get_claims())
+            inserted.set()
+            # Hold the row so the second upsert waits on our commit
+            time.sleep(0.5)
+        connection.close()
+
+    thread = threading.Thread(target=login)
+    thread.start()
+    inserted.wait()
+    user, created, changed = User.objects.upsert(**get_claims())
+    thread.join()
+    assert not created
+    assert changed == set()
+    assert user.username == 'auth0|upsert'
+
+@pytest.mark.django_db
+def test_backend_post_save(monkeypatch, django_capture_on_commit_callbacks):
+    calls = []
+    monkeypatch.setattr(
+        'app.signals.delay_unique',
+        lambda func, *args: calls.append(func.__name__),
+    )
+    saves = []
+
+    def receiver(sender, instance, created, update_fields, **kwargs):
+        saves.append((created, update_fields))
+
+    post_save.connect(receiver, sender=User)
+    try:
+        backend = Auth0Backend()
+        claims = {
+            'username': 'auth0|backend',
+            'name': 'Backend',
+            'email': 'backend@localhost',
+            'email_verified': True,
+        }
+        user = backend.authenticate(None, **claims)
+        # Receivers ran as for a create, including the Account
+        assert Account.objects.filter(user=user).exists()
+        with django_capture_on_commit_callbacks(execute=True):
+            backend.authenticate(None, **{**claims, 'name': 'Renamed'})
+            backend.authenticate(None, **{**claims, 'name': 'Renamed'})
+    finally:
+        post_save.disconnect(receiver, sender=User)
+    assert saves == [
+        (True, None),
+        (False, frozenset({'name', 'data'})),
+    ]
+    # Renamed in Auth0; nothing to send back
+    assert calls == []
+
+@pytest.mark.django_db
+def test_update_user(monkeypatch, django_capture_on_commit_callbacks):
+    calls = []
+    monkeypatch.setattr(
+        'app.signals.delay_unique',
+        lambda func, *args: calls.append(func.__name__),
+    )
+    monkeypatch.setattr('app.tasks.get_user_data', lambda user_id: {
+        'name': 'Renamed',
+        'email': 'user@localhost',
+    })
+    user = UserFactory(username='auth0|update', name='User')
+    with django_capture_on_commit_callbacks(execute=True):
+        update_user(user.id)
+    user.refresh_from_db()
+    assert user.name == 'Renamed'
+    assert calls == []
+
+# on_commit has to fire to show what would be enqueued
+@pytest.mark.django_db(transaction=True)
+def test_sync_fields(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        'app.signals.delay_unique',
+        lambda func, *args: calls.append(func.__name__),
+    )
+    user = UserFactory(username='auth0|sync', name='Sync')
+    account = user.account
+    calls.clear()
+    # Untracked fields, and named fields outside the synced set
+    user.data = {'nickname': 'sync'}
+    user.save()
+    user.save(update_fields=['data', 'last_login'])
+    account.notes = 'Notes'
+    account.save()
+    account.save(update_fields=['notes'])
+    assert calls == []
+    # As from Auth0: a login or update_user brings the name and the data
+    user.name = 'Auth0 Name'
+    user.data = {'name': 'Auth0 Name'}
+    user.save()
+    user.save(update_fields=['name', 'data'])
+    assert calls == []
+    user.name = 'Renamed'
+    user.save()
+    account.name = 'Renamed Account'
+    account.save(update_fields=['name'])
+    assert calls == ['update_auth0', 'update_user_from_account']
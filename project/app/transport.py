@@ -0,0 +1,83 @@
+import os
+import random
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session = None
+_session_pid = None
+
+
+class JitteredRetry(Retry):
+    def get_backoff_time(self):
+        # Full jitter keeps a burst of workers from retrying in lockstep
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_session():
+    retry = JitteredRetry(
+        total=settings.AUTH0_HTTP_RETRIES,
+        backoff_factor=settings.AUTH0_HTTP_BACKOFF,
+        # 429 is left to the shared rate limiter, which tells every worker
+        status_forcelist=[500, 502, 503, 504],
+        # POST is left out; user creation and code exchange aren't idempotent
+        allowed_methods=['GET', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'],
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        timeout=(
+            settings.AUTH0_HTTP_CONNECT_TIMEOUT,
+            settings.AUTH0_HTTP_READ_TIMEOUT,
+        ),
+        max_retries=retry,
+        pool_connections=settings.AUTH0_HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.AUTH0_HTTP_POOL_MAXSIZE,
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    global _session
+    global _session_pid
+    # Never share pooled sockets across a fork; rebuild in the child
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        _session = build_session()
+        _session_pid = pid
+    return _session
+
+
+def get_pool_stats():
+    if _session is None or _session_pid != os.getpid():
+        return []
+    adapter = _session.get_adapter('https://')
+    pools = adapter.poolmanager.pools
+    stats = []
+    for key in pools.keys():
+        pool = pools[key]
+        stats.append({
+            'host': pool.host,
+            'connections': pool.num_connections,
+            'requests': pool.num_requests,
+            # Empty slots in the queue are None placeholders
+            'idle': sum(1 for conn in list(pool.pool.queue) if conn),
+            'maxsize': settings.AUTH0_HTTP_POOL_MAXSIZE,
+        })
+    return stats
@@ -1,6 +1,5 @@
 # Django
 from django.urls import path
-from django.views.generic import TemplateView
 
 # Local
 from . import views
@@ -10,11 +9,11 @@ urlpatterns = [
     path('', views.index, name='index',),
 
     # Footer
-    path('about/', TemplateView.as_view(template_name='app/pages/about.html'), name='about',),
-    path('faq/', TemplateView.as_view(template_name='app/pages/faq.html'), name='faq',),
-    path('privacy/', TemplateView.as_view(template_name='app/pages/privacy.html'), name='privacy',),
-    path('terms/', TemplateView.as_view(template_name='app/pages/terms.html'), name='terms',),
-    path('support/', TemplateView.as_view(template_name='app/pages/support.html'), name='support',),
+    path('about/', views.static_page('app/pages/about.html'), name='about',),
+    path('faq/', views.static_page('app/pages/faq.html'), name='faq',),
+    path('privacy/', views.static_page('app/pages/privacy.html'), name='privacy',),
+    path('terms/', views.static_page('app/pages/terms.html'), name='terms',),
+    path('support/', views.static_page('app/pages/support.html'), name='support',),
 
     # Authentication
     path('callback', views.callback, name='callback'),
@@ -23,9 +22,26 @@ urlpatterns = [
 
     # Account
     path('account', views.account, name='account',),
-    path('thanks/', TemplateView.as_view(template_name='app/pages/thanks.html'), name='thanks',),
+    path('account/address', views.address_autocomplete, name='address-autocomplete',),
+    path('thanks/', views.static_page('app/pages/thanks.html'), name='thanks',),
+
+    # Offers
+    path('offer/<str:token>', views.offer, name='offer',),
 
     # Delete
     path('delete', views.delete, name='delete',),
 
+    # Export
+    path('export', views.export, name='export',),
+
+    # Matching
+    path('match/school/<str:school_id>', views.school_matches, name='school-matches',),
+    path('match/account/<str:account_id>', views.account_matches, name='account-matches',),
+
+    # Dispatch
+    path('vacancy/<str:vacancy_id>/candidates', views.vacancy_candidates, name='vacancy-candidates',),
+
+    # Metrics
+    path('metrics', views.metrics, name='metrics',),
+
 ]
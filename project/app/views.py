@@ -7,6 +7,7 @@ import jwt
 import requests
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate
 from django.contrib.auth import login as log_in
 from django.contrib.auth import logout as log_out
@@ -14,31 +15,63 @@ from django.contrib.auth.decorators import login_required
 from django.core.mail import EmailMessage
 from django.db import transaction
 from django.http import HttpResponse
-# from django.shortcuts import get_object_or_404
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
 from django.urls import reverse
+from django.utils.cache import patch_cache_control
 from django.utils.crypto import get_random_string
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
+from django.views.generic import TemplateView
 
+from .addresses import get_address_index
+from .caching import anonymous_cache
+from .caching import get_page_etag
+from .caching import page_etag
+from .dispatch import get_candidates
+from .exports import export_response
+from .exports import iter_account_delta_rows
+from .exports import iter_account_rows
 from .forms import AccountForm
 from .forms import DeleteForm
+from .matching import get_matches
+from .matching import rank_accounts
+from .matching import rank_schools
 from .models import Account
+from .models import ExportCursor
+from .models import Offer
+from .models import School
 from .models import User
+from .models import Vacancy
+from .offers import claim_offer
+from .queues import get_queue_stats
+from .tasks import get_account_total
+from .tasks import get_auth0_token_stats
 from .tasks import send_email
+from .transport import get_pool_stats
+from .transport import get_session
 
 log = logging.getLogger(__name__)
 
+# Pages
+def static_page(template_name, content_type=None):
+    view = TemplateView.as_view(
+        template_name=template_name,
+        content_type=content_type,
+    )
+    return page_etag()(anonymous_cache()(view))
+
 # Root
+@page_etag(tags=['accounts'])
+@anonymous_cache(tags=['accounts'])
 def index(request):
-    accounts = Account.objects.filter(
-    ).order_by('-created')
-    total = Account.objects.count()
+    total = get_account_total()
     return render(
         request,
         'app/pages/index.html',
-        {'accounts': accounts, 'total': total,},
+        {'total': total,},
     )
 
 # Authentication
@@ -90,7 +123,7 @@ def callback(request):
         'grant_type': 'authorization_code',
         'redirect_uri': redirect_uri,
     }
-    token = requests.post(
+    token = get_session().post(
         token_url,
         json=token_payload,
     ).json()
@@ -147,7 +180,24 @@ def logout(request):
     return redirect(logout_url)
 
 # Account
+def get_account_updated(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    return Account.objects.filter(
+        user=request.user,
+    ).values_list('updated', flat=True).first()
+
+def get_account_etag(request, *args, **kwargs):
+    updated = get_account_updated(request)
+    if updated is None:
+        return None
+    return get_page_etag(request, ['accounts'], extra=updated.isoformat())
+
 @login_required
+@page_etag(
+    etag_func=get_account_etag,
+    last_modified_func=get_account_updated,
+)
 def account(request):
     account = request.user.account
     if request.POST:
@@ -161,19 +211,48 @@ def account(request):
             return redirect('thanks')
     else:
         form = AccountForm(instance=account)
-    accounts = Account.objects.filter(
-    ).order_by('-created')
-    total = Account.objects.count()
+    total = get_account_total()
     return render(
         request,
         'app/pages/account.html',
         context={
             'form': form,
-            'accounts': accounts,
             'total': total,
         },
     )
 
+@login_required
+def address_autocomplete(request):
+    results = get_address_index().search(request.GET.get('q', ''))
+    response = JsonResponse({'results': results})
+    # The index only changes on deploy
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
+
+# Offers
+def offer(request, token):
+    offer = get_object_or_404(
+        Offer.objects.select_related('vacancy__school'),
+        token=token,
+    )
+    if request.method == "POST" and offer.state == Offer.STATE.sent:
+        if claim_offer(offer):
+            messages.success(
+                request,
+                "You're booked -- thank you!",
+            )
+        else:
+            messages.warning(
+                request,
+                "Sorry, this position has already been filled.",
+            )
+        return redirect('offer', token=token)
+    return render(
+        request,
+        'app/pages/offer.html',
+        {'offer': offer,},
+    )
+
 # Delete
 @login_required
 def delete(request):
@@ -194,3 +273,79 @@ def delete(request):
         'app/pages/delete.html',
         {'form': form,},
     )
+
+# Export
+@staff_member_required
+def export(request):
+    name = request.GET.get('cursor')
+    if name:
+        # Delta since the named cursor's last completed export
+        cursor, created = ExportCursor.objects.get_or_create(name=name)
+        rows = iter_account_delta_rows(cursor)
+        filename = f'hwa-{name}.csv'
+    else:
+        rows = iter_account_rows(Account.objects.all())
+        filename = 'hwa.csv'
+    return export_response(
+        rows,
+        filename=filename,
+        compress=bool(request.GET.get('gzip')),
+    )
+
+# Matching
+@staff_member_required
+def school_matches(request, school_id):
+    school = get_object_or_404(School, pk=school_id)
+    matches = get_matches(Account, rank_accounts(school))
+    return JsonResponse({
+        'school': str(school.id),
+        'accounts': [{
+            'id': str(account.id),
+            'name': account.name,
+            'distance': round(distance, 2),
+        } for account, distance in matches],
+    })
+
+@staff_member_required
+def account_matches(request, account_id):
+    account = get_object_or_404(Account, pk=account_id)
+    matches = get_matches(School, rank_schools(account))
+    return JsonResponse({
+        'account': str(account.id),
+        'schools': [{
+            'id': str(school.id),
+            'name': school.name,
+            'distance': round(distance, 2),
+        } for school, distance in matches],
+    })
+
+# Dispatch
+@staff_member_required
+def vacancy_candidates(request, vacancy_id):
+    vacancy = get_object_or_404(
+        Vacancy.objects.select_related('school'),
+        pk=vacancy_id,
+    )
+    try:
+        candidates = get_candidates(vacancy)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=409)
+    return JsonResponse({
+        'vacancy': str(vacancy.id),
+        'candidates': [{
+            'id': str(candidate['id']),
+            'name': candidate['name'],
+            'preference': candidate['preference'],
+            'is_confirmed': candidate['is_confirmed'],
+            'distance': round(candidate['distance'], 2),
+        } for candidate in candidates],
+    })
+
+# Metrics
+@staff_member_required
+def metrics(request):
+    return JsonResponse({
+        'auth0_token': get_auth0_token_stats(),
+        'auth0_pool': get_pool_stats(),
+        'queues': get_queue_stats(),
+    })
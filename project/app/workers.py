@@ -0,0 +1,132 @@
+# Standard Libary
+import logging
+import signal
+import time
+from multiprocessing import Process
+
+# Django
+from django.conf import settings
+from django.db import close_old_connections
+from django.db import connections
+from django_rq import get_worker
+from rq import SimpleWorker
+
+# Local
+from .models import Account
+
+log = logging.getLogger(__name__)
+
+
+class PersistentWorker(SimpleWorker):
+    """
+    Runs each job in the worker process instead of a forked horse.
+
+    Django, the database connection and the HTTP session are set up once
+    and reused across jobs.  As around a request, connections past
+    CONN_MAX_AGE or left broken by a job are dropped in between.
+    """
+
+    def execute_job(self, job, queue):
+        close_old_connections()
+        try:
+            return super().execute_job(job, queue)
+        finally:
+            close_old_connections()
+
+
+def ping():
+    # Benchmark job: one query, like the sync jobs' single round trip
+    return Account.objects.exists()
+
+
+STOP_SIGNALS = {signal.SIGTERM, signal.SIGINT}
+
+
+def run_worker(queues, worker_class, max_jobs):
+    # Forked with the supervisor's handlers, and the stop signals held;
+    # rq installs its own handlers in work()
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+    worker = get_worker(*queues, worker_class=worker_class)
+    # The scheduler enqueues delayed retries; rq keeps one per queue
+    worker.work(max_jobs=max_jobs, with_scheduler=True)
+    return
+
+
+def get_restart_delay(uptime, delay):
+    # A quick exit is a crash loop (eg, a bad deploy); don't spin on it
+    if uptime >= settings.RQ_MIN_UPTIME:
+        return 0
+    return min(
+        max(delay * 2, settings.RQ_RESTART_BACKOFF),
+        settings.RQ_RESTART_BACKOFF_MAX,
+    )
+
+
+def supervise(queues, workers, worker_class, max_jobs):
+    """
+    Keep a number of worker processes running, replacing any that exit.
+
+    A process exits after max_jobs jobs so leaks can't accumulate, or
+    when a job takes it down; either way only that process is replaced.
+    Processes that keep exiting soon after starting are restarted with
+    an exponential backoff.
+    """
+    stopping = []
+    processes = [None] * workers
+    started = [0] * workers
+    delays = [0] * workers
+    restarts = [None] * workers
+
+    def start(i):
+        # Held until stop() can see the new process
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        try:
+            process = Process(
+                target=run_worker,
+                args=(queues, worker_class, max_jobs),
+            )
+            process.start()
+            processes[i] = process
+            started[i] = time.monotonic()
+        finally:
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for process in processes:
+            if process:
+                process.terminate()
+
+    # Before forking, so a signal during startup still stops every child
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, stop)
+    # Children must not share the parent's database socket
+    connections.close_all()
+    for i in range(workers):
+        if stopping:
+            break
+        start(i)
+    while not stopping:
+        now = time.monotonic()
+        for i, process in enumerate(processes):
+            if process.is_alive():
+                continue
+            if restarts[i] is None:
+                delays[i] = get_restart_delay(now - started[i], delays[i])
+                restarts[i] = now + delays[i]
+                log.info(
+                    'Worker %s exited (%s); replacing in %ss',
+                    process.pid,
+                    process.exitcode,
+                    delays[i],
+                )
+            if now >= restarts[i]:
+                restarts[i] = None
+                start(i)
+        time.sleep(1)
+    for process in processes:
+        if process:
+            process.join()
+    return
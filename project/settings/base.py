@@ -13,6 +13,12 @@ env = Env(
     REDIS_URL=(str, 'redis://localhost:6379/0'),
     LOGLEVEL=(str, 'INFO'),
     ACTIVE=(bool, False),
+    AUTH0_HTTP_CONNECT_TIMEOUT=(float, 3.05),
+    AUTH0_HTTP_READ_TIMEOUT=(float, 10.0),
+    AUTH0_HTTP_RETRIES=(int, 3),
+    AUTH0_HTTP_POOL_MAXSIZE=(int, 10),
+    AUTH0_RATE_LIMIT=(float, 2.0),
+    AUTH0_RATE_BURST=(int, 10),
 )
 
 root = Path(__file__) - 2
@@ -55,11 +61,34 @@ AUTH0_CLIENT_ID = env("AUTH0_CLIENT_ID")
 AUTH0_CLIENT_SECRET = env("AUTH0_CLIENT_SECRET")
 AUTH0_DOMAIN = env("AUTH0_DOMAIN")
 AUTH0_TENANT = env("AUTH0_TENANT")
+# Refresh cached management tokens this many seconds before expiry
+AUTH0_TOKEN_LEEWAY = 300
+AUTH0_TOKEN_LOCK_TIMEOUT = 10
+
+# Auth0 Transport
+AUTH0_HTTP_CONNECT_TIMEOUT = env("AUTH0_HTTP_CONNECT_TIMEOUT")
+AUTH0_HTTP_READ_TIMEOUT = env("AUTH0_HTTP_READ_TIMEOUT")
+AUTH0_HTTP_RETRIES = env("AUTH0_HTTP_RETRIES")
+AUTH0_HTTP_BACKOFF = 0.5
+AUTH0_HTTP_POOL_CONNECTIONS = 4
+AUTH0_HTTP_POOL_MAXSIZE = env("AUTH0_HTTP_POOL_MAXSIZE")
+# Management API requests per second across all workers; set just under
+# the tenant's limit.  Throttled calls wait rather than fail.
+AUTH0_RATE_LIMIT = env("AUTH0_RATE_LIMIT")
+AUTH0_RATE_BURST = env("AUTH0_RATE_BURST")
+AUTH0_RATE_RETRIES = 3
+# The users endpoint's largest page
+AUTH0_RECONCILE_PAGE_SIZE = 100
+# Larger tenants are reconciled from a user export
+AUTH0_EXPORT_POLL_INTERVAL = 5
+AUTH0_EXPORT_TIMEOUT = 60 * 30
 
 # Database
 DATABASES = {
     'default': env.db()
 }
+# Reused across requests and jobs; persistent workers depend on it
+DATABASES['default']['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)
 
 # Cache
 CACHES = {
@@ -80,13 +109,150 @@ CACHES = {
 
 # RQ
 RQ_QUEUES = {
+    # Someone is waiting on these
+    'interactive': {
+        'USE_REDIS_CACHE': 'default',
+        'ASYNC': True,
+    },
+    # Rate-limited by the tenant, so kept off the other pools
+    'auth0': {
+        'USE_REDIS_CACHE': 'default',
+        'ASYNC': True,
+    },
+    'email': {
+        'USE_REDIS_CACHE': 'default',
+        'ASYNC': True,
+    },
+    # Exports, broadcasts and reconciles; may run for minutes
+    'bulk': {
+        'USE_REDIS_CACHE': 'default',
+        'ASYNC': True,
+        'DEFAULT_TIMEOUT': 60 * 30,
+    },
     'default': {
         'USE_REDIS_CACHE': 'default',
         'ASYNC': True,
     },
 }
+# Worker pools, run by `rqpool <name>`; queues in priority order
+RQ_POOLS = {
+    'interactive': {
+        'queues': ['interactive', 'default'],
+        'workers': 2,
+    },
+    'auth0': {
+        'queues': ['auth0'],
+        'workers': 1,
+    },
+    'email': {
+        'queues': ['email', 'interactive'],
+        'workers': 2,
+    },
+    'bulk': {
+        'queues': ['bulk'],
+        'workers': 1,
+        # Long jobs; a fork per job hands their memory back
+        'worker_class': 'rq.Worker',
+    },
+}
+RQ_WORKER_CLASS = 'app.workers.PersistentWorker'
+# Each worker process is replaced after this many jobs
+RQ_MAX_JOBS = 1000
+# Workers exiting sooner than this are restarted with a growing delay
+RQ_MIN_UPTIME = 30
+RQ_RESTART_BACKOFF = 1
+RQ_RESTART_BACKOFF_MAX = 60
+# Seconds delay_unique holds a job id while checking and enqueuing
+RQ_UNIQUE_LOCK_TIMEOUT = 10
 RQ_SHOW_ADMIN_LINK = True
 
+# Outbox
+OUTBOX_BATCH_SIZE = 100
+
+# Counters
+# Seconds between recounts of the account total
+ACCOUNT_TOTAL_TTL = 60 * 60
+
+# Exports
+EXPORT_CHUNK_SIZE = 2000
+# Delta exports trail now by this many seconds to catch late commits
+EXPORT_DELTA_LAG = 60
+
+# Page Cache
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_LOCAL_SIZE = 256
+# Other processes can serve a page this many seconds past invalidation
+PAGE_CACHE_LOCAL_TTL = 5
+
+# Schools
+SCHOOLS_PATH = (root - 1)('school.json')
+# Trigram similarity a typed name needs, and its lead over the runner-up
+SCHOOL_MATCH_THRESHOLD = 0.5
+SCHOOL_MATCH_MARGIN = 0.15
+
+# Matching
+MATCH_LIMIT = 10
+# Account search starts this close and doubles out to the radius
+MATCH_RADIUS_START_KM = 5
+MATCH_RADIUS_KM = 80
+
+# Dispatch
+# Candidate search starts this close and doubles out to the radius
+DISPATCH_RADIUS_START_KM = 2
+DISPATCH_RADIUS_KM = 40
+DISPATCH_LIMIT = 50
+
+# Availability
+SCHOOL_YEAR_START_MONTH = 8
+# Room for every weekday in a year: 48 bytes, 384 bits
+AVAILABILITY_BYTES = 48
+
+# Offers
+SITE_URL = 'https://www.helpwestada.com'
+SMS_BACKEND = 'app.sms.LocalSMSBackend'
+OFFER_CONCURRENCY = 16
+# Per channel: sends per second and sends in flight
+OFFER_CHANNELS = {
+    'email': {
+        'rate': 20,
+        'concurrency': 8,
+    },
+    'sms': {
+        'rate': 10,
+        'concurrency': 4,
+    },
+}
+
+# Broadcasts
+BROADCAST_BATCH_SIZE = 100
+# Seconds between batches, to stay inside the provider's send rate
+BROADCAST_THROTTLE = 1.0
+# Batches per job; the rest of a broadcast continues in a follow-up job
+BROADCAST_BATCHES_PER_JOB = 50
+
+# Geocoding
+GEOCODER = 'app.geocoding.LocalGeocoder'
+GEOHASH_PRECISION = 9
+# Quota and outage errors; seconds before each retry
+GEOCODE_RETRIES = 3
+GEOCODE_RETRY_INTERVALS = [60, 600, 3600]
+
+# Address Autocomplete
+# One district-area street address per line
+ADDRESS_INDEX_PATH = env("ADDRESS_INDEX_PATH", default=(root - 1)('addresses.txt'))
+# County address points, built into the index by build_addresses
+ADDRESS_SOURCE_URL = env("ADDRESS_SOURCE_URL", default='')
+ADDRESS_SOURCE_FORMAT = env(
+    "ADDRESS_SOURCE_FORMAT",
+    default='{ADDRESS}, {CITY}, ID {ZIPCODE}',
+)
+ADDRESS_AUTOCOMPLETE_LIMIT = 8
+ADDRESS_AUTOCOMPLETE_MIN_LENGTH = 3
+
+# Compression
+# Dynamic pages are compressed per request; favor speed over ratio
+BROTLI_QUALITY = 5
+
 # Sessions
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
@@ -96,6 +262,8 @@ SESSION_SERIALIZER = 'app.serializers.HashidJSONEncoder'
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL")
 EMAIL_CONFIG = env.email_url('EMAIL_URL')
 vars().update(EMAIL_CONFIG)
+# Attachments are encoded once per send and shared; cap their size
+EMAIL_ATTACHMENT_MAX_BYTES = 10 * 1024 * 1024
 DATALAKE_STORAGE = None
 
 # Static File Management
@@ -161,6 +329,7 @@ BOOTSTRAP4 = {
 # Middleware
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'app.middleware.CompressionMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -24,7 +24,8 @@ CLOUDINARY_STORAGE = {
 }
 
 # Async settings
-RQ_QUEUES['default']['ASYNC'] = False
+for queue in RQ_QUEUES.values():
+    queue['ASYNC'] = False
 
 DEBUG_TOOLBAR_PANELS = [
     'debug_toolbar.panels.versions.VersionsPanel',
@@ -13,6 +13,9 @@ SENDGRID_API_KEY = env("SENDGRID_API_KEY")
 SENDGRID_TRACK_CLICKS_HTML = False
 SENDGRID_TRACK_CLICKS_PLAIN = False
 
+# Geocoding
+GEOCODER = 'app.geocoding.GoogleGeocoder'
+
 # Whitenoise Compression
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -1,23 +1,23 @@
 # Third-Party
 # Django
+# First-Party
+from app.views import static_page
 from django.conf import settings
 from django.contrib import admin
 from django.shortcuts import render
 from django.urls import include
 from django.urls import path
-from django.views.generic import TemplateView
-# First-Party
 from sentry_sdk import last_event_id
 
 urlpatterns = [
     path('', include('app.urls')),
     path('admin/', admin.site.urls),
     path('django-rq/', include('django_rq.urls')),
-    path('robots.txt', TemplateView.as_view(
+    path('robots.txt', static_page(
         template_name='app/root/robots.txt',
         content_type='text/plain"',
     )),
-    path('sitemap.txt', TemplateView.as_view(
+    path('sitemap.txt', static_page(
         template_name='app/root/sitemap.txt',
         content_type='text/plain"',
     )),